@@ -0,0 +1,82 @@
+# backend/benchmarks/bench_kernels.py
+"""
+List sorters vs. NumPy kernels on identical inputs.
+
+    python -m backend.benchmarks.bench_kernels --sizes 500 2000 5000
+
+For every algorithm/size it reports the best-of-N runtime of both backends,
+the speedup, and whether sorted output and comparison/swap counters agree.
+"""
+from __future__ import annotations
+from typing import Dict, List
+import argparse
+import sys
+import time
+
+from ..sorting.algorithms import SUPPORTED_ALGORITHMS, DISTRIBUTIONS, generate_array, run_sort
+from ..sorting.kernels import NUMPY_KERNELS
+
+
+def _best_ms(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, (time.perf_counter() - start) * 1000.0)
+    return best
+
+
+def bench(
+    algorithms: List[str],
+    sizes: List[int],
+    distribution: str,
+    repeat: int,
+) -> List[Dict]:
+    rows: List[Dict] = []
+    for algo in algorithms:
+        for n in sizes:
+            arr = generate_array(n, distribution)
+            ref, comps, swaps, _, _ = run_sort(algo, arr, False, "list")
+            out, np_comps, np_swaps, _ = NUMPY_KERNELS[algo](arr, False)
+
+            list_ms = _best_ms(lambda: run_sort(algo, arr, False, "list"), repeat)
+            np_ms = _best_ms(lambda: NUMPY_KERNELS[algo](arr, False), repeat)
+            np_nocount_ms = _best_ms(
+                lambda: NUMPY_KERNELS[algo](arr, False, count=False), repeat)
+            rows.append({
+                "algorithm": algo,
+                "n": n,
+                "list_ms": list_ms,
+                "numpy_ms": np_ms,
+                "numpy_nocount_ms": np_nocount_ms,
+                "speedup": list_ms / np_ms if np_ms > 0 else float("inf"),
+                "sorted_match": out.tolist() == ref,
+                "counters_match": (comps, swaps) == (np_comps, np_swaps),
+            })
+    return rows
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--algorithms", nargs="+",
+                        default=list(SUPPORTED_ALGORITHMS), choices=list(SUPPORTED_ALGORITHMS))
+    parser.add_argument("--sizes", nargs="+", type=int,
+                        default=[500, 2000, 5000])
+    parser.add_argument("--distribution", default="random", choices=DISTRIBUTIONS)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    rows = bench(args.algorithms, args.sizes, args.distribution, args.repeat)
+    header = f"{'algorithm':<16}{'n':>8}{'list ms':>12}{'numpy ms':>12}" \
+             f"{'no-count':>12}{'speedup':>10}  match"
+    print(header)
+    print("-" * len(header))
+    for r in rows:
+        match = "ok" if r["sorted_match"] and r["counters_match"] else "MISMATCH"
+        print(f"{r['algorithm']:<16}{r['n']:>8}{r['list_ms']:>12.2f}{r['numpy_ms']:>12.2f}"
+              f"{r['numpy_nocount_ms']:>12.2f}{r['speedup']:>9.1f}x  {match}")
+    return 0 if all(r["sorted_match"] and r["counters_match"] for r in rows) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
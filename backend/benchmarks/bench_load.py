@@ -0,0 +1,548 @@
+# backend/benchmarks/bench_load.py
+"""
+Load test for the API: throughput, latency and saturation per endpoint.
+
+    python -m backend.benchmarks.bench_load --concurrency 1 4 16 64 --output load.json
+    python -m backend.benchmarks.bench_load --server uvicorn --workers 4 --database postgres
+    python -m backend.benchmarks.bench_load --mode isolated --baseline load.json
+    python -m backend.benchmarks.bench_load --train
+
+Serves backend.main in-process (ASGI transport, no sockets) or under a
+uvicorn subprocess. The database is a throwaway SQLite file, a throwaway
+local Postgres cluster (initdb/pg_ctl from PATH, standing in for a
+container), or any --database-url. --train trains the runtime models into
+the run's temp dir first and adds predict to the default mix. Every concurrency level replays the
+traffic mix with a closed loop for --duration seconds and records, per
+scenario, requests/s, latency percentiles, errors and status codes, as
+well as the server's CPU and peak RSS. A level saturates when raising
+concurrency gains less than SATURATION_GAIN in throughput.
+
+In-process runs share one interpreter (and GIL) between the client and
+the server, so their CPU figures include the client; use --server uvicorn
+to size deployments.
+"""
+from __future__ import annotations
+from typing import Callable, Dict, List, Optional, Tuple
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from ..sorting.algorithms import DISTRIBUTIONS, SUPPORTED_ALGORITHMS
+
+# Scenario -> request factory: rng -> (method, path, json body or query params)
+Request = Tuple[str, str, Dict]
+
+SORTERS_ALL = list(SUPPORTED_ALGORITHMS)
+SORTERS_NLOGN = [a for a, info in SUPPORTED_ALGORITHMS.items()
+                 if info["average"] != "O(n^2)"]
+
+
+def _run(sizes: List[int], algorithms: List[str], record_steps: bool) -> Callable[[random.Random], Request]:
+    def make(rng: random.Random) -> Request:
+        return "POST", "/api/run", {
+            "algorithm": rng.choice(algorithms),
+            "size": rng.choice(sizes),
+            "distribution": rng.choice(DISTRIBUTIONS),
+            "record_steps": record_steps,
+        }
+    return make
+
+
+def _predict(rng: random.Random) -> Request:
+    return "POST", "/api/predict", {
+        "algorithm": rng.choice(SORTERS_ALL),
+        "n": rng.choice([100, 1000, 10000, 50000]),
+        "distribution": rng.choice(DISTRIBUTIONS),
+    }
+
+
+def _runs(rng: random.Random) -> Request:
+    return "GET", "/api/runs", {"limit": 100}
+
+
+SCENARIOS: Dict[str, Callable[[random.Random], Request]] = {
+    # The visualizer: small arrays with step recording
+    "run_visual": _run([50, 100], SORTERS_ALL, True),
+    "run_small": _run([100, 500], SORTERS_ALL, False),
+    "run_medium": _run([1000, 2000], SORTERS_ALL, False),
+    "run_large": _run([5000], SORTERS_NLOGN, False),
+    "auto": _run([1000, 5000], ["auto"], False),
+    # 503 until models are trained (POST /api/train, or --train)
+    "predict": _predict,
+    "runs": _runs,
+}
+
+# Relative weights of the default traffic mix. predict is only added with
+# --train: without trained models it measures the 503 fast path
+DEFAULT_MIX: Dict[str, float] = {
+    "run_visual": 3,
+    "run_small": 3,
+    "run_medium": 2,
+    "run_large": 1,
+    "runs": 1,
+}
+TRAINED_MIX: Dict[str, float] = {**DEFAULT_MIX, "predict": 2}
+
+# A concurrency level saturates when it adds less than this in throughput
+SATURATION_GAIN = 0.10
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(
+    os.path.dirname(os.path.abspath(__file__))))
+
+
+def _percentile(sorted_values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def summarize(samples: List[Tuple[int, float]], duration_s: float) -> Dict:
+    """Throughput, error and latency figures of (status, latency_ms) samples."""
+    latencies = sorted(ms for _, ms in samples)
+    statuses: Dict[str, int] = {}
+    for status, _ in samples:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    # status 0: the request never got a response (connection error, timeout)
+    errors = sum(1 for status, _ in samples if status == 0 or status >= 400)
+    return {
+        "requests": len(samples),
+        "throughput_rps": len(samples) / duration_s if duration_s > 0 else 0.0,
+        "errors": errors,
+        "error_rate": errors / len(samples) if samples else 0.0,
+        "status_counts": statuses,
+        "latency_ms": {
+            "mean": sum(latencies) / len(latencies) if latencies else None,
+            "p50": _percentile(latencies, 0.50),
+            "p90": _percentile(latencies, 0.90),
+            "p99": _percentile(latencies, 0.99),
+            "max": latencies[-1] if latencies else None,
+        },
+    }
+
+
+class ResourceSampler:
+    """
+    Polls CPU time and RSS of a process and its children in a background
+    thread. Uses psutil when installed, else /proc (Linux); elsewhere it
+    reports nothing.
+    """
+
+    def __init__(self, pid: int, interval_s: float = 0.25):
+        self.pid = pid
+        self.interval_s = interval_s
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._cpu_start = self._wall_start = 0.0
+        self._rss_peak = 0
+        try:
+            import psutil
+            self._psutil = psutil.Process(pid)
+        except ImportError:
+            self._psutil = None
+        self.available = self._psutil is not None or os.path.exists(f"/proc/{pid}/stat")
+
+    def _tree(self) -> List[int]:
+        pids, i = [self.pid], 0
+        while i < len(pids):
+            try:
+                for task in os.listdir(f"/proc/{pids[i]}/task"):
+                    with open(f"/proc/{pids[i]}/task/{task}/children") as f:
+                        pids.extend(int(p) for p in f.read().split())
+            except OSError:
+                pass
+            i += 1
+        return pids
+
+    def _read(self) -> Tuple[float, int]:
+        """(cpu seconds, rss bytes) summed over the process tree."""
+        if self._psutil is not None:
+            procs = [self._psutil] + self._psutil.children(recursive=True)
+            cpu = rss = 0
+            for p in procs:
+                try:
+                    t = p.cpu_times()
+                    cpu += t.user + t.system
+                    rss += p.memory_info().rss
+                except Exception:
+                    pass
+            return cpu, rss
+        ticks = os.sysconf("SC_CLK_TCK")
+        page = os.sysconf("SC_PAGE_SIZE")
+        cpu = rss = 0
+        for pid in self._tree():
+            try:
+                with open(f"/proc/{pid}/stat") as f:
+                    # fields after the parenthesized command name
+                    fields = f.read().rsplit(")", 1)[1].split()
+                cpu += (int(fields[11]) + int(fields[12])) / ticks
+                with open(f"/proc/{pid}/statm") as f:
+                    rss += int(f.read().split()[1]) * page
+            except OSError:
+                pass
+        return cpu, rss
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            _, rss = self._read()
+            self._rss_peak = max(self._rss_peak, rss)
+
+    def start(self) -> None:
+        if not self.available:
+            return
+        self._cpu_start, self._rss_peak = self._read()
+        self._wall_start = time.perf_counter()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> Dict[str, Optional[float]]:
+        if self._thread is None:
+            return {"cpu_percent": None, "rss_peak_mb": None}
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        cpu, rss = self._read()
+        wall = time.perf_counter() - self._wall_start
+        return {
+            # 100 = one core fully busy
+            "cpu_percent": 100.0 * (cpu - self._cpu_start) / wall if wall > 0 else None,
+            "rss_peak_mb": max(self._rss_peak, rss) / 2 ** 20,
+        }
+
+
+async def drive(
+    client,
+    mix: Dict[str, float],
+    concurrency: int,
+    duration_s: float,
+    warmup_s: float,
+    seed: int,
+) -> Tuple[Dict[str, List[Tuple[int, float]]], float]:
+    """
+    Closed-loop load: `concurrency` clients each send the next request of
+    the mix as soon as the previous one returns. Samples started during the
+    warmup are dropped. Returns scenario -> [(status, latency_ms)] and the
+    measured duration.
+    """
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    samples: Dict[str, List[Tuple[int, float]]] = {name: [] for name in names}
+    start = time.perf_counter()
+    measure_from = start + warmup_s
+    end = measure_from + duration_s
+
+    async def client_loop(rng: random.Random) -> None:
+        while True:
+            sent = time.perf_counter()
+            if sent >= end:
+                return
+            name = rng.choices(names, weights)[0]
+            method, path, payload = SCENARIOS[name](rng)
+            try:
+                if method == "GET":
+                    resp = await client.get(path, params=payload)
+                else:
+                    resp = await client.post(path, json=payload)
+                status = resp.status_code
+            except Exception:
+                status = 0
+            if sent >= measure_from:
+                samples[name].append((status, (time.perf_counter() - sent) * 1000.0))
+
+    await asyncio.gather(*(client_loop(random.Random(seed * 1000 + i))
+                           for i in range(concurrency)))
+    return samples, time.perf_counter() - measure_from
+
+
+def find_saturation(levels: List[int], rps: List[float]) -> Dict:
+    """Peak throughput and the last level that still scaled it."""
+    if not levels:
+        return {"peak_rps": 0.0, "peak_concurrency": None, "saturation_concurrency": None}
+    peak = max(range(len(levels)), key=lambda i: rps[i])
+    saturation = None
+    for i in range(1, len(levels)):
+        if rps[i] < rps[i - 1] * (1 + SATURATION_GAIN):
+            saturation = levels[i - 1]
+            break
+    return {
+        "peak_rps": rps[peak],
+        "peak_concurrency": levels[peak],
+        # None: throughput still scaled at the highest level tried
+        "saturation_concurrency": saturation,
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_postgres(tmp_dir: str) -> Tuple[str, Callable[[], None]]:
+    """
+    Throwaway Postgres cluster listening on a Unix socket in tmp_dir, for
+    hosts without a container runtime. Returns its URL and a stop function.
+    """
+    initdb, pg_ctl = shutil.which("initdb"), shutil.which("pg_ctl")
+    if initdb is None or pg_ctl is None:
+        raise RuntimeError("initdb/pg_ctl not on PATH; pass --database-url instead")
+    data_dir = os.path.join(tmp_dir, "pgdata")
+    port = _free_port()
+    subprocess.run([initdb, "-D", data_dir, "-U", "postgres", "--auth=trust"],
+                   check=True, capture_output=True)
+    subprocess.run(
+        [pg_ctl, "-D", data_dir, "-w", "-l", os.path.join(tmp_dir, "pg.log"),
+         "-o", f"-p {port} -k {tmp_dir} -c listen_addresses=''", "start"],
+        check=True, capture_output=True)
+
+    def stop() -> None:
+        subprocess.run([pg_ctl, "-D", data_dir, "-m", "fast", "stop"],
+                       capture_output=True)
+
+    return f"postgresql+psycopg2://postgres@/postgres?host={tmp_dir}&port={port}", stop
+
+
+def start_uvicorn(database_url: str, workers: int) -> Tuple[str, subprocess.Popen]:
+    """Serve backend.main in a uvicorn subprocess; returns its base URL and process."""
+    import httpx
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+    from ..database import Base
+    from ..stats.rollup import backfill
+
+    # Workers would race each other creating the tables of a fresh database,
+    # so prepare it once up front, as a deploy's migration step would
+    engine = create_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as db:
+        backfill(db)
+    engine.dispose()
+
+    port = _free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--host", "127.0.0.1",
+         "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        cwd=_REPO_ROOT,
+        env={**os.environ, "DATABASE_URL": database_url},
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.perf_counter() + 60
+    while time.perf_counter() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with code {proc.returncode}")
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1.0).status_code == 200:
+                return base_url, proc
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("uvicorn did not become healthy within 60 s")
+
+
+async def _train(client) -> None:
+    """Train the runtime models through the API, so predict and auto use them."""
+    print("training models ...")
+    resp = await client.post("/api/train", timeout=None)
+    resp.raise_for_status()
+
+
+async def _sweep(client, sampler: ResourceSampler, args, mixes: Dict[str, Dict[str, float]]) -> List[Dict]:
+    if args.train:
+        await _train(client)
+    results: List[Dict] = []
+    for label, mix in mixes.items():
+        for concurrency in args.concurrency:
+            sampler.start()
+            samples, duration_s = await drive(
+                client, mix, concurrency, args.duration, args.warmup, args.seed)
+            server = sampler.stop()
+            everything = [s for per in samples.values() for s in per]
+            results.append({
+                "mix": label,
+                "concurrency": concurrency,
+                "duration_s": duration_s,
+                "total": summarize(everything, duration_s),
+                "scenarios": {name: summarize(per, duration_s)
+                              for name, per in samples.items()},
+                "server": server,
+            })
+            total = results[-1]["total"]
+            print(f"{label:<12}{concurrency:>6}{total['throughput_rps']:>10.1f}"
+                  f"{total['latency_ms']['p50'] or 0:>10.1f}{total['latency_ms']['p99'] or 0:>10.1f}"
+                  f"{100 * total['error_rate']:>8.1f}%"
+                  f"{server['cpu_percent'] or 0:>8.0f}%{server['rss_peak_mb'] or 0:>9.0f}")
+    return results
+
+
+async def _run_in_process(args, mixes) -> List[Dict]:
+    import httpx
+    from ..main import app
+
+    # Unhandled server errors become 500s, as they would over the network
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench",
+                                     timeout=args.timeout) as client:
+            return await _sweep(client, ResourceSampler(os.getpid()), args, mixes)
+
+
+async def _run_remote(base_url: str, pid: int, args, mixes) -> List[Dict]:
+    import httpx
+
+    limits = httpx.Limits(max_connections=max(args.concurrency))
+    async with httpx.AsyncClient(base_url=base_url, limits=limits,
+                                 timeout=args.timeout) as client:
+        return await _sweep(client, ResourceSampler(pid), args, mixes)
+
+
+def saturation_report(results: List[Dict]) -> Dict[str, Dict]:
+    """find_saturation for each mix total and each scenario within it."""
+    report: Dict[str, Dict] = {}
+    for label in dict.fromkeys(r["mix"] for r in results):
+        rows = [r for r in results if r["mix"] == label]
+        levels = [r["concurrency"] for r in rows]
+        report[label] = find_saturation(levels, [r["total"]["throughput_rps"] for r in rows])
+        if len(rows[0]["scenarios"]) > 1:
+            for name in rows[0]["scenarios"]:
+                report[f"{label}/{name}"] = find_saturation(
+                    levels, [r["scenarios"][name]["throughput_rps"] for r in rows])
+    return report
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=_REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare_to_baseline(report: Dict[str, Dict], baseline: Dict) -> None:
+    print(f"\nvs. baseline {baseline['meta'].get('git_commit') or '?'}")
+    for name, sat in report.items():
+        old = baseline.get("saturation", {}).get(name)
+        if old is None or not old["peak_rps"]:
+            continue
+        change = 100.0 * (sat["peak_rps"] - old["peak_rps"]) / old["peak_rps"]
+        print(f"  {name:<24} peak {old['peak_rps']:>8.1f} -> {sat['peak_rps']:>8.1f} rps "
+              f"({change:+.1f}%)")
+
+
+def _parse_mix(spec: Optional[str]) -> Dict[str, float]:
+    if not spec:
+        return dict(DEFAULT_MIX)
+    mix: Dict[str, float] = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"unknown scenario {name!r}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--server", choices=["inprocess", "uvicorn"], default="inprocess")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--database", choices=["sqlite", "postgres"], default="sqlite")
+    parser.add_argument("--database-url", help="use this database instead of a throwaway one")
+    parser.add_argument("--mix", type=_parse_mix, default=None,
+                        help="scenario=weight,... out of: " + ", ".join(SCENARIOS))
+    parser.add_argument("--mode", choices=["mix", "isolated"], default="mix",
+                        help="replay the mix, or each of its scenarios on its own")
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 4, 16, 64])
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per level")
+    parser.add_argument("--warmup", type=float, default=2.0, help="seconds per level")
+    parser.add_argument("--timeout", type=float, default=60.0, help="per request")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--train", action="store_true",
+                        help="POST /api/train before the sweep, into the temp dir, "
+                             "and add predict to the default mix")
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--baseline", help="JSON of an earlier run to compare against")
+    args = parser.parse_args(argv)
+
+    mix = args.mix or dict(TRAINED_MIX if args.train else DEFAULT_MIX)
+    mixes = {"mix": mix} if args.mode == "mix" else {name: {name: 1.0} for name in mix}
+
+    with tempfile.TemporaryDirectory(prefix="intellisort-load-") as tmp:
+        if args.train:
+            # Read by backend.ml.runtime_model, in-process or in uvicorn
+            os.environ["MODELS_DIR"] = os.path.join(tmp, "models")
+        stop_db = None
+        if args.database_url:
+            database_url = args.database_url
+        elif args.database == "postgres":
+            database_url, stop_db = start_postgres(tmp)
+        else:
+            database_url = f"sqlite:///{os.path.join(tmp, 'load.db')}"
+
+        print(f"{'mix':<12}{'conc':>6}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}"
+              f"{'errors':>9}{'cpu':>9}{'rss MB':>9}")
+        try:
+            if args.server == "uvicorn":
+                base_url, proc = start_uvicorn(database_url, args.workers)
+                try:
+                    results = asyncio.run(_run_remote(base_url, proc.pid, args, mixes))
+                finally:
+                    proc.terminate()
+                    proc.wait(timeout=30)
+            else:
+                # backend.database builds its engine from DATABASE_URL on import
+                os.environ["DATABASE_URL"] = database_url
+                results = asyncio.run(_run_in_process(args, mixes))
+        finally:
+            if stop_db is not None:
+                stop_db()
+
+    report = saturation_report(results)
+    print("\nsaturation (concurrency where throughput stopped scaling):")
+    for name, sat in report.items():
+        print(f"  {name:<24} peak {sat['peak_rps']:>8.1f} rps at {sat['peak_concurrency']}, "
+              f"saturates at {sat['saturation_concurrency'] or 'n/a'}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare_to_baseline(report, json.load(f))
+    if args.output:
+        output = {
+            "meta": {
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "git_commit": _git_commit(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+                "server": args.server,
+                "workers": args.workers if args.server == "uvicorn" else None,
+                "database": "url" if args.database_url else args.database,
+                "mode": args.mode,
+                "mix": mix,
+                "concurrency": args.concurrency,
+                "duration_s": args.duration,
+                "warmup_s": args.warmup,
+                "seed": args.seed,
+                "trained": args.train,
+            },
+            "results": results,
+            "saturation": report,
+        }
+        with open(args.output, "w") as f:
+            json.dump(output, f, indent=2)
+        print(f"\nwrote {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
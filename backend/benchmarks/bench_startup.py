@@ -0,0 +1,93 @@
+# backend/benchmarks/bench_startup.py
+"""
+Cold-start budget for the API process.
+
+    python -m backend.benchmarks.bench_startup --budget-ms 1500
+
+Imports backend.main in fresh interpreters under `python -X importtime`,
+reports the median import time and its slowest direct dependencies, and
+fails if the budget is exceeded or the ML stack is loaded at import.
+"""
+from __future__ import annotations
+from typing import Dict, List, Tuple
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+# Modules that must only be imported lazily, on the first predict/train call
+LAZY_MODULES = ("numpy", "sklearn", "scipy", "pandas")
+
+_PROBE = (
+    "import sys, time\n"
+    "start = time.perf_counter()\n"
+    "import backend.main\n"
+    "print((time.perf_counter() - start) * 1000.0)\n"
+    "print(','.join(m for m in {lazy!r} if m in sys.modules))\n"
+)
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(
+    os.path.dirname(os.path.abspath(__file__))))
+
+
+def _parse_importtime(stderr: str, depth: int) -> List[Tuple[str, int]]:
+    """(package, cumulative us) entries of -X importtime output at a nesting depth."""
+    entries: List[Tuple[str, int]] = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # one leading space, plus two per nesting level
+        if len(name) - len(name.lstrip(" ")) == 1 + 2 * depth:
+            entries.append((name.strip(), int(cumulative)))
+    return entries
+
+
+def measure_once() -> Dict:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c",
+         _PROBE.format(lazy=LAZY_MODULES)],
+        cwd=_REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    wall_ms, loaded = proc.stdout.splitlines()[-2:]
+    return {
+        "import_ms": float(wall_ms),
+        "lazy_loaded": [m for m in loaded.split(",") if m],
+        # what `import backend.main` pulls in directly
+        "dependencies": _parse_importtime(proc.stderr, 1),
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--budget-ms", type=float, default=1500.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8)
+    args = parser.parse_args(argv)
+
+    runs = [measure_once() for _ in range(args.repeat)]
+    median_ms = statistics.median(r["import_ms"] for r in runs)
+    lazy_loaded = sorted({m for r in runs for m in r["lazy_loaded"]})
+
+    print(f"import backend.main: median {median_ms:.1f} ms over {args.repeat} runs "
+          f"(budget {args.budget_ms:.0f} ms)")
+    print("slowest direct imports (last run):")
+    for name, us in sorted(runs[-1]["dependencies"], key=lambda e: -e[1])[:args.top]:
+        print(f"  {us / 1000.0:>9.1f} ms  {name}")
+
+    ok = True
+    if lazy_loaded:
+        print(f"FAIL: imported at startup: {', '.join(lazy_loaded)}")
+        ok = False
+    if median_ms > args.budget_ms:
+        print(f"FAIL: over budget by {median_ms - args.budget_ms:.1f} ms")
+        ok = False
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,29 +1,127 @@
 # backend/main.py
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
 from fastapi import FastAPI, Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from typing import List, Optional
-import uvicorn
+from typing import Dict, List, Optional, Tuple
+import os
+import tempfile
+import time
 
-from .database import Base, engine, get_db
-from .models import AlgorithmRun
-from .sorting.algorithms import SUPPORTED_ALGORITHMS, DISTRIBUTIONS, generate_array, run_sort
+from .database import Base, SessionLocal, engine, get_db
+from .models import AlgorithmRun, ExternalSortStats, InflightRun, RunRollup, RunSeries
+from .sorting.algorithms import (
+    SUPPORTED_ALGORITHMS,
+    DISTRIBUTIONS,
+    SORT_BACKENDS,
+    SortBudget,
+    SortInterrupted,
+    fits_int64,
+    generate_array,
+    run_sort,
+)
+from .sorting.external import FILE_FORMATS, RUN_ALGORITHMS, external_sort, write_input_file
+from .sorting.compare import compare_algorithms
+from .stats.jobs import schedule_compaction
+from .stats.rollup import (
+    RESOLUTIONS, backfill, bucket_start, compact, n_bucket, record_run, summarize,
+)
 from .schemas import (
     AlgorithmInfo,
     RunRequest,
     RunResponse,
     RunRecord,
     Metrics,
+    SelectionInfo,
+    CompareRequest,
+    CompareResponse,
+    CompareResult,
+    ExternalSortRequest,
+    ExternalSortResponse,
+    ExternalSortMetrics,
     PredictRequest,
     PredictResponse,
     TrainResponse,
+    RollupStats,
+    SeriesPoint,
+    CompactResponse,
 )
-from .ml.runtime_model import load_models_if_available, train_models, predict
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+# NumPy, scikit-learn and everything importing them (sorting.profiler,
+# sorting.kernels, ml.*) are imported inside the handlers that need them, so
+# workers start fast and processes that only sort never load the ML stack.
+
+AUTO_ALGORITHM = "auto"
+INT64_DETAIL = "Array values must fit in a signed 64-bit integer"
+# Server-side ceilings on worker time, whatever the client asks for
+RUN_TIME_LIMIT_MS = float(os.getenv("RUN_TIME_LIMIT_MS", "10000"))
+COMPARE_TIME_LIMIT_MS = float(os.getenv("COMPARE_TIME_LIMIT_MS", "30000"))
+EXTERNAL_SORT_TIME_LIMIT_MS = float(os.getenv("EXTERNAL_SORT_TIME_LIMIT_MS", "60000"))
+# How often a cancellable run re-reads its inflight_runs row
+CANCEL_POLL_S = 0.1
+
+
+class _CancelFlag:
+    """
+    Cancel event of a run, backed by its inflight_runs row so a cancel served
+    by any worker process is seen. The row is re-read at most every
+    CANCEL_POLL_S.
+    """
+
+    def __init__(self, cancel_token: str):
+        self.cancel_token = cancel_token
+        self._cancelled = False
+        self._next_poll = 0.0
+
+    def is_set(self) -> bool:
+        now = time.perf_counter()
+        if not self._cancelled and now >= self._next_poll:
+            self._next_poll = now + CANCEL_POLL_S
+            with SessionLocal() as db:
+                self._cancelled = bool(
+                    db.query(InflightRun.cancelled)
+                    .filter(InflightRun.cancel_token == self.cancel_token)
+                    .scalar())
+        return self._cancelled
+
+
+def _register_run(db: Session, cancel_token: str) -> None:
+    """Claim a cancel_token for a starting run; 409 if another run holds it."""
+    # Rows outliving any run are left over from a crashed worker
+    stale = datetime.now(timezone.utc).replace(tzinfo=None) \
+        - timedelta(milliseconds=2 * RUN_TIME_LIMIT_MS)
+    db.query(InflightRun).filter(InflightRun.cancel_token == cancel_token,
+                                 InflightRun.started_at < stale).delete()
+    db.add(InflightRun(cancel_token=cancel_token, cancelled=False))
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="cancel_token already in use")
+
+
+def _unregister_run(db: Session, cancel_token: str) -> None:
+    db.query(InflightRun).filter(InflightRun.cancel_token == cancel_token).delete()
+    db.commit()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Create tables (and indexes added to existing ones), fold any runs
+    # predating the rollups once. Retention runs on a schedule
+    # (stats.jobs), not here: it scans the raw runs table.
+    Base.metadata.create_all(bind=engine)
+    for index in AlgorithmRun.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
+    with SessionLocal() as db:
+        backfill(db)
+    schedule_compaction()
+    yield
+
 
-app = FastAPI(title="IntelliSort API", version="0.1.0")
+app = FastAPI(title="IntelliSort API", version="0.1.0", lifespan=lifespan)
 
 origins = ["http://localhost:3000", "http://127.0.0.1:3000"]
 app.add_middleware(
@@ -34,9 +132,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Load models if present
-load_models_if_available()
-
 
 @app.get("/api/algorithms", response_model=List[AlgorithmInfo])
 def get_algorithms():
@@ -56,42 +151,274 @@ def get_algorithms():
     return res
 
 
+def _run_key(algorithm: str, backend: str) -> str:
+    """
+    algorithm_name a run is stored under. Backends other than the list
+    sorters get their own key (like external_*), so their much faster runs
+    stay out of the list sorters' rollups and history.
+    """
+    return algorithm if backend == "list" else f"{backend}_{algorithm}"
+
+
+def _load_history(
+    db: Session, distribution: str, n: int, backend: str = "list"
+) -> Dict[str, List[Tuple[float, float, int]]]:
+    """
+    Rolled-up runs on the same distribution and backend in the n-buckets
+    overlapping [n / 2, 2n], as (mean n, mean runtime_ms, run count) per
+    bucket, keyed by algorithm.
+    """
+    keys = {_run_key(a, backend): a for a in SUPPORTED_ALGORITHMS}
+    rows = (
+        db.query(RunRollup.algorithm_name, RunRollup.mean_n,
+                 RunRollup.mean_ms, RunRollup.count)
+        .filter(RunRollup.distribution == distribution)
+        .filter(RunRollup.n_bucket >= n_bucket(max(n // 2, 1)),
+                RunRollup.n_bucket <= n * 2)
+        .filter(RunRollup.algorithm_name.in_(list(keys)))
+        .all()
+    )
+    history: Dict[str, List[Tuple[float, float, int]]] = {}
+    for name, mean_n, mean_ms, count in rows:
+        history.setdefault(keys[name], []).append((mean_n, mean_ms, count))
+    return history
+
+
 @app.post("/api/run", response_model=RunResponse)
 def run_algorithm(req: RunRequest, db: Session = Depends(get_db)):
-    if req.algorithm not in SUPPORTED_ALGORITHMS:
+    if req.algorithm != AUTO_ALGORITHM and req.algorithm not in SUPPORTED_ALGORITHMS:
         raise HTTPException(status_code=400, detail="Unsupported algorithm")
     if req.distribution not in DISTRIBUTIONS and req.array is None:
         raise HTTPException(status_code=400, detail="Unsupported distribution")
+    if req.backend not in SORT_BACKENDS:
+        raise HTTPException(status_code=400, detail="Unsupported backend")
+    # Profiling and the NumPy kernels work on int64 copies of the input
+    needs_int64 = req.profile or req.algorithm == AUTO_ALGORITHM or req.backend == "numpy"
+    if req.array is not None and needs_int64 and not fits_int64(req.array):
+        raise HTTPException(status_code=400, detail=INT64_DETAIL)
 
     if req.array is not None:
         arr = req.array
     else:
         arr = generate_array(req.size, req.distribution)
 
-    sorted_arr, comps, swaps, runtime_ms, steps = run_sort(
-        req.algorithm, arr, req.record_steps)
+    algorithm = req.algorithm
+    distribution = req.distribution
+    profile = selection = None
+    if req.profile or algorithm == AUTO_ALGORITHM:
+        from .sorting.profiler import profile_array, infer_distribution
+        start = time.perf_counter()
+        profile = profile_array(arr)
+        profile_ms = (time.perf_counter() - start) * 1000.0
+        # A client array's distribution label is free text; store the run
+        # under the one its profile matches, as selection reads history by it
+        if req.array is not None:
+            distribution = infer_distribution(profile)
+    if algorithm == AUTO_ALGORITHM:
+        from .ml.auto_select import select_algorithm
+        start = time.perf_counter()
+        algorithm, estimates = select_algorithm(
+            profile, distribution, _load_history(db, distribution, len(arr), req.backend))
+        selection_ms = (time.perf_counter() - start) * 1000.0
 
-    run = AlgorithmRun(
-        algorithm_name=req.algorithm,
+    cancel_event = None
+    if req.cancel_token is not None:
+        _register_run(db, req.cancel_token)
+        cancel_event = _CancelFlag(req.cancel_token)
+    budget = SortBudget(
+        time_limit_ms=min(req.time_limit_ms or RUN_TIME_LIMIT_MS, RUN_TIME_LIMIT_MS),
+        max_comparisons=req.max_comparisons,
+        cancel_event=cancel_event,
+    )
+
+    completed, progress, stop_reason = True, 1.0, None
+    try:
+        sorted_arr, comps, swaps, runtime_ms, steps = run_sort(
+            algorithm, arr, req.record_steps, req.backend, budget)
+    except SortInterrupted as e:
+        sorted_arr, comps, swaps, runtime_ms, steps = (
+            e.array, e.comparisons, e.swaps, e.runtime_ms, e.steps)
+        completed, progress, stop_reason = False, e.progress, e.reason
+    finally:
+        if req.cancel_token is not None:
+            _unregister_run(db, req.cancel_token)
+
+    if req.algorithm == AUTO_ALGORITHM:
+        selection = SelectionInfo(
+            algorithm=algorithm,
+            distribution=distribution,
+            profile=profile,
+            profile_ms=profile_ms,
+            selection_ms=selection_ms,
+            estimates=estimates,
+            predicted_runtime_ms=estimates[algorithm]["expected_ms"],
+            actual_runtime_ms=runtime_ms,
+        )
+
+    # Partial runs are not measurements of the full sort; keep them out of
+    # the history used for selection and analysis
+    if completed:
+        run = AlgorithmRun(
+            algorithm_name=_run_key(algorithm, req.backend),
+            n=len(arr),
+            distribution=distribution,
+            runtime_ms=runtime_ms,
+            comparisons=comps,
+            swaps=swaps,
+        )
+        record_run(db, run)
+        db.commit()
+
+    metrics = Metrics(
+        algorithm=algorithm,
         n=len(arr),
-        distribution=req.distribution,
+        distribution=distribution,
         runtime_ms=runtime_ms,
         comparisons=comps,
         swaps=swaps,
+        backend=req.backend,
+    )
+    return RunResponse(sorted=sorted_arr, metrics=metrics, steps=steps,
+                       completed=completed, progress=progress, stop_reason=stop_reason,
+                       profile=profile, selection=selection)
+
+
+@app.post("/api/run/{cancel_token}/cancel")
+def cancel_run(cancel_token: str, db: Session = Depends(get_db)):
+    """
+    Ask an in-flight run to stop; it returns its partial state within about
+    CANCEL_POLL_S. Works across worker processes sharing the database.
+    """
+    updated = (
+        db.query(InflightRun)
+        .filter(InflightRun.cancel_token == cancel_token)
+        .update({"cancelled": True})
     )
-    db.add(run)
+    db.commit()
+    if not updated:
+        raise HTTPException(status_code=404, detail="No in-flight run with this token")
+    return {"status": "cancelling"}
+
+
+@app.post("/api/compare", response_model=CompareResponse)
+def compare(req: CompareRequest, db: Session = Depends(get_db)):
+    """
+    Race several algorithms on one shared input with interleaved timed
+    trials; returns timing statistics and frame-aligned traces per algorithm.
+    """
+    algorithms = req.algorithms or list(SUPPORTED_ALGORITHMS)
+    if any(a not in SUPPORTED_ALGORITHMS for a in algorithms):
+        raise HTTPException(status_code=400, detail="Unsupported algorithm")
+    if len(set(algorithms)) != len(algorithms):
+        raise HTTPException(status_code=400, detail="Duplicate algorithm")
+    if req.distribution not in DISTRIBUTIONS and req.array is None:
+        raise HTTPException(status_code=400, detail="Unsupported distribution")
+    if req.backend not in SORT_BACKENDS:
+        raise HTTPException(status_code=400, detail="Unsupported backend")
+    # The shared input buffer holds int64 values
+    if req.array is not None and not fits_int64(req.array):
+        raise HTTPException(status_code=400, detail=INT64_DETAIL)
+
+    arr = req.array if req.array is not None else generate_array(
+        req.size, req.distribution)
+    n = len(arr)
+    results = compare_algorithms(
+        algorithms, arr, trials=req.trials, frames=req.frames,
+        workers=req.workers, backend=req.backend,
+        time_limit_ms=min(req.time_limit_ms or COMPARE_TIME_LIMIT_MS, COMPARE_TIME_LIMIT_MS))
+
+    # One row per fully measured algorithm with its median runtime
+    for algo, res in results.items():
+        if not res["completed"]:
+            continue
+        record_run(db, AlgorithmRun(
+            algorithm_name=_run_key(algo, req.backend),
+            n=n,
+            distribution=req.distribution,
+            runtime_ms=res["median_ms"],
+            comparisons=res["comparisons"],
+            swaps=res["swaps"],
+        ))
+    db.commit()
+
+    return CompareResponse(
+        n=n,
+        distribution=req.distribution,
+        trials=req.trials,
+        frame_count=max(len(res["frames"]) for res in results.values()),
+        completed=all(res["completed"] for res in results.values()),
+        results=[CompareResult(algorithm=a, **res) for a, res in results.items()],
+    )
+
+
+@app.post("/api/external-sort", response_model=ExternalSortResponse)
+def run_external_sort(req: ExternalSortRequest, db: Session = Depends(get_db)):
+    """
+    Benchmark the out-of-core sort: generate an input file, sort it in
+    `chunk_size` runs spilled to disk, and k-way merge into an mmap'd output.
+    """
+    if req.algorithm != "builtin" and req.algorithm not in RUN_ALGORITHMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Run algorithm must be builtin or one of {', '.join(RUN_ALGORITHMS)}")
+    if req.distribution not in DISTRIBUTIONS:
+        raise HTTPException(status_code=400, detail="Unsupported distribution")
+    if req.file_format not in FILE_FORMATS:
+        raise HTTPException(status_code=400, detail="Unsupported file format")
+
+    with tempfile.TemporaryDirectory(prefix="intellisort-") as tmp:
+        input_path = os.path.join(tmp, "input")
+        output_path = os.path.join(tmp, "output")
+        write_input_file(input_path, generate_array(
+            req.size, req.distribution), req.file_format)
+        try:
+            result = external_sort(
+                input_path,
+                output_path,
+                fmt=req.file_format,
+                chunk_size=req.chunk_size,
+                fan_in=req.fan_in,
+                buffer_items=req.buffer_items,
+                run_algorithm=None if req.algorithm == "builtin" else req.algorithm,
+                tmp_dir=tmp,
+                budget=SortBudget(time_limit_ms=EXTERNAL_SORT_TIME_LIMIT_MS),
+            )
+        except SortInterrupted:
+            raise HTTPException(
+                status_code=400,
+                detail=f"External sort exceeded the {EXTERNAL_SORT_TIME_LIMIT_MS:.0f} ms "
+                       "server limit; use a smaller size or the builtin run sort")
+
+    run = AlgorithmRun(
+        algorithm_name=f"external_{req.algorithm}",
+        n=result["n"],
+        distribution=req.distribution,
+        runtime_ms=result["runtime_ms"],
+        comparisons=result["comparisons"],
+        swaps=result["swaps"],
+    )
+    record_run(db, run)
+    db.add(ExternalSortStats(
+        run_id=run.id,
+        file_format=req.file_format,
+        chunk_size=req.chunk_size,
+        fan_in=req.fan_in,
+        runs=result["runs"],
+        merge_passes=result["merge_passes"],
+        bytes_read=result["bytes_read"],
+        bytes_written=result["bytes_written"],
+        throughput_mb_s=result["throughput_mb_s"],
+    ))
     db.commit()
     db.refresh(run)
 
-    metrics = Metrics(
-        algorithm=req.algorithm,
-        n=len(arr),
+    metrics = ExternalSortMetrics(
+        algorithm=run.algorithm_name,
         distribution=req.distribution,
-        runtime_ms=runtime_ms,
-        comparisons=comps,
-        swaps=swaps,
+        file_format=req.file_format,
+        **result,
     )
-    return RunResponse(sorted=sorted_arr, metrics=metrics, steps=steps)
+    return ExternalSortResponse(run_id=run.id, metrics=metrics)
 
 
 @app.get("/api/runs", response_model=List[RunRecord])
@@ -126,17 +453,84 @@ def list_runs(
     ]
 
 
+@app.get("/api/stats", response_model=List[RollupStats])
+def list_stats(
+    db: Session = Depends(get_db),
+    algorithm: Optional[str] = None,
+    distribution: Optional[str] = None,
+):
+    """Rolled-up runtime statistics per (algorithm, distribution, n-bucket)."""
+    q = db.query(RunRollup)
+    if algorithm:
+        q = q.filter(RunRollup.algorithm_name == algorithm)
+    if distribution:
+        q = q.filter(RunRollup.distribution == distribution)
+    q = q.order_by(RunRollup.algorithm_name, RunRollup.distribution, RunRollup.n_bucket)
+    return [RollupStats(**summarize(r)) for r in q.all()]
+
+
+@app.get("/api/stats/series", response_model=List[SeriesPoint])
+def list_series(
+    db: Session = Depends(get_db),
+    resolution: str = "day",
+    algorithm: Optional[str] = None,
+    distribution: Optional[str] = None,
+    n_bucket: Optional[int] = None,
+    since: Optional[datetime] = None,
+    limit: int = 1000,
+):
+    """Time-bucketed runtime statistics, oldest bucket first."""
+    if resolution not in RESOLUTIONS:
+        raise HTTPException(status_code=400, detail="Unsupported resolution")
+    q = db.query(RunSeries).filter(RunSeries.resolution == resolution)
+    if algorithm:
+        q = q.filter(RunSeries.algorithm_name == algorithm)
+    if distribution:
+        q = q.filter(RunSeries.distribution == distribution)
+    if n_bucket is not None:
+        q = q.filter(RunSeries.n_bucket == n_bucket)
+    if since is not None:
+        q = q.filter(RunSeries.bucket_start >= bucket_start(since, resolution))
+    q = q.order_by(RunSeries.bucket_start, RunSeries.algorithm_name,
+                   RunSeries.distribution, RunSeries.n_bucket).limit(limit)
+    return [SeriesPoint(bucket_start=r.bucket_start, **summarize(r)) for r in q.all()]
+
+
+@app.post("/api/stats/compact", response_model=CompactResponse)
+def compact_runs(db: Session = Depends(get_db)):
+    """Apply the retention policy now (otherwise run by stats.jobs)."""
+    return CompactResponse(**compact(db))
+
+
 @app.post("/api/predict", response_model=PredictResponse)
 def predict_runtime(req: PredictRequest):
+    from .ml.runtime_model import predict
+    from .sorting.profiler import profile_array, infer_distribution
+
+    profile = None
+    if req.array is not None:
+        if not fits_int64(req.array):
+            raise HTTPException(status_code=400, detail=INT64_DETAIL)
+        profile = profile_array(req.array)
+        n = len(req.array)
+        distribution = req.distribution or infer_distribution(profile)
+    elif req.n is not None and req.distribution is not None:
+        n, distribution = req.n, req.distribution
+    else:
+        raise HTTPException(
+            status_code=400, detail="Provide either array or n and distribution")
     try:
         predicted_class, class_probs, runtime_ms = predict(
-            req.algorithm, req.n, req.distribution)
+            req.algorithm, n, distribution, profile)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except RuntimeError as e:
         raise HTTPException(status_code=503, detail=str(e))
     return PredictResponse(
         predicted_class=predicted_class,
         class_probabilities=class_probs,
         predicted_runtime_ms=runtime_ms,
+        profile=profile,
     )
 
 
@@ -146,6 +540,8 @@ def train_endpoint():
     Train the ML models on synthetic data and return metrics.
     Note: training is fully synthetic and does not use the DB.
     """
+    from .ml.runtime_model import train_models
+
     result = train_models()  # returns a dict
 
     # result has keys: "status", "trained_on_samples", "accuracy", "runtime_mae_ms"
@@ -158,6 +554,8 @@ def health():
 
 
 if __name__ == "__main__":
+    import uvicorn
+
     uvicorn.run("backend.main:app", host="0.0.0.0", port=8000, reload=True)
 
 
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Tuple
+import math
+
+from ..sorting.algorithms import SUPPORTED_ALGORITHMS
+from . import runtime_model
+
+# How many measured runs the model prediction is worth when blending the two
+PRIOR_WEIGHT = 5.0
+
+# Milliseconds per element operation of the list sorters, used to put the
+# model-free cost estimate on the same scale as predictions and history
+# when there is nothing to calibrate it against
+MS_PER_OP = 1e-4
+
+# Lomuto with a last-element pivot degrades to O(n^2) on presorted input in
+# either direction
+PRESORTED_INVERSION_RATIO = 0.05
+
+
+def _scale(algorithm: str, n_from: int, n_to: int) -> float:
+    """Ratio of the algorithm's average-case cost at n_to vs n_from."""
+    if SUPPORTED_ALGORITHMS[algorithm]["average"] == "O(n^2)":
+        return (n_to / n_from) ** 2
+    return (n_to * math.log2(max(n_to, 2))) / (n_from * math.log2(max(n_from, 2)))
+
+
+def _cost_model(algorithm: str, profile: Dict[str, float]) -> float:
+    """
+    Model-free cost estimate (element operations) used when there is neither
+    a trained model nor history to go on.
+    """
+    n = max(profile["n"], 2)
+    if algorithm == "insertion_sort":
+        return n + profile["inversion_ratio"] * n * (n - 1) / 2
+    if algorithm in ("bubble_sort", "selection_sort"):
+        return n * (n - 1) / 2
+    return n * math.log2(n) * (2.0 if algorithm == "heap_sort" else 1.0)
+
+
+def _predict_ms(algorithms: List[str], distribution: str,
+                profile: Dict[str, float]) -> Dict[str, float]:
+    """Model predictions for all candidates at once; empty without a model."""
+    try:
+        return runtime_model.predict_runtimes(
+            algorithms, int(profile["n"]), distribution, profile)
+    except (RuntimeError, ValueError):
+        return {}
+
+
+def select_algorithm(
+    profile: Dict[str, float],
+    distribution: str,
+    history: Dict[str, List[Tuple[float, float, int]]],
+) -> Tuple[str, Dict[str, Dict[str, Optional[float]]]]:
+    """
+    Pick the algorithm with the lowest expected runtime for a profiled input.
+
+    `history` maps algorithm -> [(mean n, mean runtime_ms, runs), ...] of
+    rolled-up past runs on the same distribution. Each bucket mean is
+    rescaled to the profiled n by the algorithm's average-case complexity
+    and blended, weighted by run count, with the model prediction. Returns
+    the choice and the per-algorithm estimates.
+    """
+    n = int(profile["n"])
+    presorted = (profile["inversion_ratio"] <= PRESORTED_INVERSION_RATIO
+                 or profile["inversion_ratio"] >= 1 - PRESORTED_INVERSION_RATIO)
+
+    candidates = [a for a in SUPPORTED_ALGORITHMS
+                  if not (a == "quick_sort" and presorted)]
+    predictions = _predict_ms(candidates, distribution, profile)
+    estimates: Dict[str, Dict[str, Optional[float]]] = {}
+    for algo in candidates:
+        predicted = predictions.get(algo)
+        buckets = history.get(algo, [])
+        runs = sum(c for _, _, c in buckets)
+        measured = None
+        if runs:
+            measured = sum(rt * c * _scale(algo, max(sn, 2), max(n, 2))
+                           for sn, rt, c in buckets) / runs
+        if predicted is not None and measured is not None:
+            expected = (predicted * PRIOR_WEIGHT + measured * runs) \
+                / (PRIOR_WEIGHT + runs)
+        else:
+            expected = predicted if predicted is not None else measured
+        estimates[algo] = {
+            "predicted_ms": predicted,
+            "history_ms": measured,
+            "history_runs": runs,
+            "expected_ms": expected,
+        }
+
+    # Algorithms with neither a prediction nor history fall back to the cost
+    # model, calibrated against the ones that have an estimate, so they still
+    # compete instead of being dropped
+    known = {a: e["expected_ms"] for a, e in estimates.items()
+             if e["expected_ms"] is not None}
+    ms_per_op = MS_PER_OP
+    if known:
+        ratios = sorted(ms / _cost_model(a, profile) for a, ms in known.items())
+        ms_per_op = ratios[len(ratios) // 2]
+    for algo, e in estimates.items():
+        if e["expected_ms"] is None:
+            e["expected_ms"] = _cost_model(algo, profile) * ms_per_op
+    choice = min(estimates, key=lambda a: estimates[a]["expected_ms"])
+    return choice, estimates
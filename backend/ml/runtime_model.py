@@ -1,33 +1,35 @@
 from __future__ import annotations
 
-from typing import Dict, Tuple, Optional, List
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, Tuple, Optional, List
 import math
 import os
 import pickle
+import random
 
 import numpy as np
-from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score, mean_absolute_error, mean_squared_error
+
+if TYPE_CHECKING:
+    # scikit-learn takes about a second to import; it is only loaded for
+    # training or when unpickling trained models
+    from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+
+from ..sorting.algorithms import (
+    SUPPORTED_ALGORITHMS,
+    DISTRIBUTION_LABELS,
+    DISTRIBUTIONS as DIST_KEYS,
+    ALGORITHM_INDEX,
+    DISTRIBUTION_INDEX,
+    generate_array,
+)
+from ..sorting.profiler import PROFILE_FEATURES, profile_array, profile_features, typical_profile
 
 # --- Constants -----------------------------------------------------------------
 
-ALGORITHMS: List[str] = [
-    "Bubble Sort",
-    "Insertion Sort",
-    "Selection Sort",
-    "Merge Sort",
-    "Quick Sort",
-    "Heap Sort",
-]
+# Display labels in registry order (sorting.algorithms is the source of truth)
+ALGORITHMS: List[str] = [meta["label"] for meta in SUPPORTED_ALGORITHMS.values()]
 
-DISTRIBUTIONS: List[str] = [
-    "Random",
-    "Sorted",
-    "Reverse",
-    "Nearly sorted",
-    "Many duplicates",
-]
+DISTRIBUTIONS: List[str] = list(DISTRIBUTION_LABELS.values())
 
 # Index -> human-readable label
 CLASS_LABELS: List[str] = [
@@ -36,53 +38,93 @@ CLASS_LABELS: List[str] = [
     "O(n^2)",      # 2
 ]
 
-MODELS_DIR = os.path.join(os.path.dirname(__file__), "..", "models_store")
+# Overridable so throwaway runs (benchmarks) can train without touching the
+# models checked in under backend/models_store
+MODELS_DIR = os.getenv("MODELS_DIR", os.path.join(os.path.dirname(__file__), "..", "models_store"))
 CLASSIFIER_PATH = os.path.join(MODELS_DIR, "runtime_classifier.pkl")
 REGRESSOR_PATH = os.path.join(MODELS_DIR, "runtime_regressor.pkl")
 
+# [algo_idx, dist_idx, n, log2(n), n^2] + input profile
+FEATURE_COUNT = 5 + len(PROFILE_FEATURES)
+
+# Copied and filled in for predictions on a measured profile
+_ROW_TEMPLATE = np.zeros((1, FEATURE_COUNT), dtype=float)
+
 _classifier: Optional[RandomForestClassifier] = None
 _regressor: Optional[RandomForestRegressor] = None
 
+# Model file mtimes at the last load that left no usable models (missing,
+# corrupt or stale); loading is retried only once the files change
+_failed_load: Optional[Tuple[Optional[int], Optional[int]]] = None
+
 
 # --- Helpers -------------------------------------------------------------------
 
 def load_models_if_available(*args, **kwargs) -> bool:
     """
-    No-op loader for now.
-
-    This function exists so backend.main can import it without crashing.
-    It simply returns whether models are already loaded in memory.
+    Load persisted models on first use; returns whether models are in memory.
+    A failed load is not repeated until the model files change on disk.
     """
-    global _classifier, _regressor
+    global _failed_load
+    if _classifier is None or _regressor is None:
+        files = _model_files_key()
+        if files != _failed_load:
+            load_models()
+            if _classifier is None or _regressor is None:
+                _failed_load = files
     return _classifier is not None and _regressor is not None
 
 
+def _model_files_key() -> Tuple[Optional[int], Optional[int]]:
+    """Modification times (ns) of the model files, None for a missing file."""
+    def mtime(path: str) -> Optional[int]:
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+    return mtime(CLASSIFIER_PATH), mtime(REGRESSOR_PATH)
+
+
 def _algo_index(name: str) -> int:
+    """Encode an algorithm given by API key ("bubble_sort") or label ("Bubble Sort")."""
     try:
-        return ALGORITHMS.index(name)
-    except ValueError:
-        return 0
+        return ALGORITHM_INDEX[name]
+    except KeyError:
+        raise ValueError(f"Unsupported algorithm: {name}") from None
 
 
 def _dist_index(name: str) -> int:
+    """Encode a distribution given by API key ("nearly_sorted") or label ("Nearly sorted")."""
     try:
-        return DISTRIBUTIONS.index(name)
-    except ValueError:
-        return 0
+        return DISTRIBUTION_INDEX[name]
+    except KeyError:
+        raise ValueError(f"Unsupported distribution: {name}") from None
 
 
 def _complexity_index(algo: str) -> int:
     """
-    Map algorithm name -> complexity class index.
+    Map algorithm name -> complexity class index from its average case.
     Bubble/Insertion/Selection -> O(n^2)
     Merge/Quick/Heap -> O(n log n)
     (We currently don't use O(n) but keep it as class 0 for future.)
     """
-    if algo in ("Bubble Sort", "Insertion Sort", "Selection Sort"):
-        return 2  # O(n^2)
-    if algo in ("Merge Sort", "Quick Sort", "Heap Sort"):
-        return 1  # O(n log n)
-    return 1
+    return _COMPLEXITY_BY_INDEX[_algo_index(algo)]
+
+
+_COMPLEXITY_BY_INDEX: List[int] = [
+    2 if meta["average"] == "O(n^2)" else 1  # O(n^2) / O(n log n)
+    for meta in SUPPORTED_ALGORITHMS.values()
+]
+
+
+@lru_cache(maxsize=4096)
+def _typical_row(algo_idx: int, dist_idx: int, n: int) -> np.ndarray:
+    """Feature row for a prediction from n + distribution alone (read-only)."""
+    row = _ROW_TEMPLATE.copy()
+    row[0, :5] = (algo_idx, dist_idx, n, math.log2(n), n * n)
+    row[0, 5:] = profile_features(typical_profile(DIST_KEYS[dist_idx], n))
+    row.flags.writeable = False
+    return row
 
 
 def _generate_synthetic_data(
@@ -90,7 +132,8 @@ def _generate_synthetic_data(
 ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
     """
     Generate synthetic training data.
-    X columns: [algo_idx, dist_idx, n, log2(n), n^2]
+    X columns: [algo_idx, dist_idx, n, log2(n), n^2] + PROFILE_FEATURES of a
+               generated input of that distribution and size
     y_class: complexity class index (0,1,2)
     y_runtime: "ms" with noise around theoretical curve.
     """
@@ -103,6 +146,22 @@ def _generate_synthetic_data(
 
     rng = np.random.default_rng(42)
 
+    # generate_array draws from the global `random`; seed it for repeatable
+    # profiles without disturbing anyone else's stream
+    random_state = random.getstate()
+    random.seed(42)
+    try:
+        profiles = {
+            (dist_idx, n): [
+                profile_array(generate_array(n, DIST_KEYS[dist_idx]))
+                for _ in range(samples_per_combo)
+            ]
+            for dist_idx in range(len(DISTRIBUTIONS))
+            for n in n_sizes
+        }
+    finally:
+        random.setstate(random_state)
+
     for algo in ALGORITHMS:
         algo_idx = _algo_index(algo)
         comp_idx = _complexity_index(algo)
@@ -111,20 +170,26 @@ def _generate_synthetic_data(
             dist_idx = _dist_index(dist)
 
             for n in n_sizes:
-                for _ in range(samples_per_combo):
+                for profile in profiles[(dist_idx, n)]:
                     logn = math.log2(n)
                     n2 = n * n
 
                     # base runtime shape by complexity
-                    if comp_idx == 2:  # O(n^2)
+                    if algo == "Insertion Sort":
+                        # adaptive: linear scan plus one shift per inversion
+                        base = 1e-4 * (n + 2 * profile["inversion_ratio"] * n2)
+                    elif comp_idx == 2:  # O(n^2)
                         base = 1e-4 * n2
                     elif comp_idx == 1:  # O(n log n)
                         base = 5e-3 * n * logn
                     else:  # O(n)
                         base = 1e-2 * n
 
-                    # distribution tweaks
-                    if dist == "Sorted":
+                    # distribution tweaks (already captured by inversions
+                    # for insertion sort)
+                    if algo == "Insertion Sort":
+                        pass
+                    elif dist == "Sorted":
                         base *= 0.6
                     elif dist == "Reverse":
                         base *= 1.3
@@ -136,7 +201,8 @@ def _generate_synthetic_data(
                     noise = rng.normal(loc=0.0, scale=0.15 * base)
                     runtime_ms = max(base + noise, 0.01)
 
-                    rows.append([algo_idx, dist_idx, n, logn, n2])
+                    rows.append([algo_idx, dist_idx, n, logn, n2]
+                                + profile_features(profile))
                     class_labels.append(comp_idx)
                     runtimes.append(runtime_ms)
 
@@ -156,6 +222,10 @@ def train_models() -> Dict[str, float]:
     """
     global _classifier, _regressor
 
+    from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+    from sklearn.model_selection import train_test_split
+    from sklearn.metrics import accuracy_score, mean_absolute_error, mean_squared_error
+
     if not os.path.exists(MODELS_DIR):
         os.makedirs(MODELS_DIR, exist_ok=True)
 
@@ -228,6 +298,10 @@ def load_models() -> None:
                 _classifier = pickle.load(f)
             with open(REGRESSOR_PATH, "rb") as f:
                 _regressor = pickle.load(f)
+            # Models trained on an older feature layout must be retrained
+            if (_classifier.n_features_in_ != FEATURE_COUNT
+                    or _regressor.n_features_in_ != FEATURE_COUNT):
+                raise ValueError("stale model feature layout")
         except Exception:
             # If loading fails, reset to None; caller can retrain.
             _classifier = None
@@ -241,30 +315,37 @@ def predict(
     algorithm: str,
     n: int,
     distribution: str,
+    profile: Optional[Dict[str, float]] = None,
 ) -> Tuple[str, Dict[str, float], float]:
     """
     Predict complexity class & runtime.
 
+    `algorithm` and `distribution` may be API keys or display labels; unknown
+    names raise ValueError. `profile` is the profile_array() of the actual input; without it the
+    typical profile of `distribution` at size n is assumed.
+
     Handles the case where the classifier has only a subset of CLASS_LABELS
     by using classifier.classes_ instead of assuming all 3 are present.
     """
     global _classifier, _regressor
 
-    if _classifier is None or _regressor is None:
+    if not load_models_if_available():
         raise RuntimeError("Models are not trained yet.")
 
     algo_idx = _algo_index(algorithm)
     dist_idx = _dist_index(distribution)
-    logn = math.log2(n)
-    n2 = n * n
 
-    X = np.array([[algo_idx, dist_idx, n, logn, n2]], dtype=float)
+    if profile is None:
+        X = _typical_row(algo_idx, dist_idx, n)
+    else:
+        X = _ROW_TEMPLATE.copy()
+        X[0, :5] = (algo_idx, dist_idx, n, math.log2(n), n * n)
+        X[0, 5:] = profile_features(profile)
 
-    # class prediction
-    class_idx = int(_classifier.predict(X)[0])
-
-    # probs_raw aligned with _classifier.classes_
+    # probs_raw aligned with _classifier.classes_; the predicted class is its
+    # argmax, exactly as _classifier.predict would compute it
     probs_raw = _classifier.predict_proba(X)[0]
+    class_idx = int(_classifier.classes_[int(np.argmax(probs_raw))])
     probs: Dict[str, float] = {label: 0.0 for label in CLASS_LABELS}
 
     for class_value, prob in zip(_classifier.classes_, probs_raw):
@@ -275,3 +356,25 @@ def predict(
     predicted_label = CLASS_LABELS[class_idx]
 
     return predicted_label, probs, runtime_ms
+
+
+def predict_runtimes(
+    algorithms: List[str],
+    n: int,
+    distribution: str,
+    profile: Dict[str, float],
+) -> Dict[str, float]:
+    """
+    Predicted runtime_ms of each algorithm on one profiled input, from a
+    single regressor call over all of them (the classifier is not consulted).
+    Raises like predict().
+    """
+    if not load_models_if_available():
+        raise RuntimeError("Models are not trained yet.")
+
+    dist_idx = _dist_index(distribution)
+    X = np.empty((len(algorithms), FEATURE_COUNT), dtype=float)
+    X[:, 0] = [_algo_index(a) for a in algorithms]
+    X[:, 1:5] = (dist_idx, n, math.log2(n), n * n)
+    X[:, 5:] = profile_features(profile)
+    return dict(zip(algorithms, (float(ms) for ms in _regressor.predict(X))))
@@ -1,5 +1,5 @@
 # backend/models.py
-from sqlalchemy import Column, Integer, String, Float, DateTime
+from sqlalchemy import Boolean, Column, Integer, String, Float, DateTime, ForeignKey, JSON, UniqueConstraint
 from sqlalchemy.sql import func
 from .database import Base
 
@@ -14,4 +14,83 @@ class AlgorithmRun(Base):
     runtime_ms = Column(Float, nullable=False)
     comparisons = Column(Integer, nullable=False)
     swaps = Column(Integer, nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Indexed for retention (stats.rollup.compact) and newest-first listing
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+
+class InflightRun(Base):
+    """
+    A running /api/run with a cancel_token. Kept in the database so a cancel
+    request reaches the run whichever worker process serves it.
+    """
+    __tablename__ = "inflight_runs"
+
+    cancel_token = Column(String, primary_key=True)
+    cancelled = Column(Boolean, nullable=False, default=False)
+    started_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class ExternalSortStats(Base):
+    """Disk-side metrics for an out-of-core run, keyed by its AlgorithmRun."""
+    __tablename__ = "external_sort_stats"
+
+    id = Column(Integer, primary_key=True, index=True)
+    run_id = Column(Integer, ForeignKey("algorithm_runs.id"),
+                    index=True, nullable=False)
+    file_format = Column(String, nullable=False)
+    chunk_size = Column(Integer, nullable=False)
+    fan_in = Column(Integer, nullable=False)
+    runs = Column(Integer, nullable=False)
+    merge_passes = Column(Integer, nullable=False)
+    bytes_read = Column(Integer, nullable=False)
+    bytes_written = Column(Integer, nullable=False)
+    throughput_mb_s = Column(Float, nullable=False)
+
+
+class _RollupColumns:
+    """Incremental statistics of the runs in one (algorithm, distribution, n-bucket)."""
+    id = Column(Integer, primary_key=True, index=True)
+    algorithm_name = Column(String, nullable=False)
+    distribution = Column(String, nullable=False)
+    # Power of two: the bucket holds runs with n_bucket <= n < 2 * n_bucket
+    n_bucket = Column(Integer, nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+    mean_n = Column(Float, nullable=False, default=0.0)
+    # Welford state of runtime_ms
+    mean_ms = Column(Float, nullable=False, default=0.0)
+    m2_ms = Column(Float, nullable=False, default=0.0)
+    min_ms = Column(Float, nullable=True)
+    max_ms = Column(Float, nullable=True)
+    mean_comparisons = Column(Float, nullable=False, default=0.0)
+    mean_swaps = Column(Float, nullable=False, default=0.0)
+    # DDSketch of runtime_ms (see backend/stats/sketch.py)
+    sketch = Column(JSON, nullable=True)
+
+
+class RunRollup(_RollupColumns, Base):
+    """All-time statistics per (algorithm, distribution, n-bucket)."""
+    __tablename__ = "run_rollups"
+    __table_args__ = (
+        UniqueConstraint("algorithm_name", "distribution", "n_bucket"),
+    )
+
+
+class RunSeries(_RollupColumns, Base):
+    """The same statistics per hour or day; hourly buckets expire first."""
+    __tablename__ = "run_series"
+    __table_args__ = (
+        UniqueConstraint("resolution", "bucket_start",
+                         "algorithm_name", "distribution", "n_bucket"),
+    )
+
+    resolution = Column(String, nullable=False)
+    bucket_start = Column(DateTime, index=True, nullable=False)
+
+
+class RollupState(Base):
+    """Single row recording that pre-existing runs were folded into the rollups."""
+    __tablename__ = "rollup_state"
+
+    id = Column(Integer, primary_key=True)
+    backfilled_through = Column(Integer, nullable=False)
+    backfilled_at = Column(DateTime(timezone=True), server_default=func.now())
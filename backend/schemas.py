@@ -18,8 +18,16 @@ class RunRequest(BaseModel):
     algorithm: str
     size: int = Field(ge=2, le=5000)
     distribution: str
-    array: Optional[List[int]] = None
+    array: Optional[List[int]] = Field(default=None, min_length=2)
     record_steps: bool = True
+    backend: str = "list"
+    # Return the input's presortedness profile (always on for "auto")
+    profile: bool = False
+    # Stop early and return partial state (capped by RUN_TIME_LIMIT_MS)
+    time_limit_ms: Optional[float] = Field(default=None, gt=0)
+    max_comparisons: Optional[int] = Field(default=None, ge=1)
+    # Client-chosen id for cancelling the run via /api/run/{token}/cancel
+    cancel_token: Optional[str] = Field(default=None, min_length=1, max_length=128)
 
 
 class Metrics(BaseModel):
@@ -29,12 +37,107 @@ class Metrics(BaseModel):
     runtime_ms: float
     comparisons: int
     swaps: int
+    backend: str = "list"
+
+
+class AlgorithmEstimate(BaseModel):
+    predicted_ms: Optional[float] = None
+    history_ms: Optional[float] = None
+    history_runs: int = 0
+    expected_ms: Optional[float] = None
+
+
+class SelectionInfo(BaseModel):
+    algorithm: str
+    distribution: str
+    profile: Dict[str, float]
+    profile_ms: float
+    # Time spent choosing: history lookup plus model predictions
+    selection_ms: float
+    estimates: Dict[str, AlgorithmEstimate]
+    predicted_runtime_ms: Optional[float] = None
+    actual_runtime_ms: float
 
 
 class RunResponse(BaseModel):
     sorted: List[int]
     metrics: Metrics
     steps: List[List[int]]
+    # False when the run stopped early; `sorted` then holds the partial state
+    completed: bool = True
+    progress: float = 1.0
+    stop_reason: Optional[str] = None
+    profile: Optional[Dict[str, float]] = None
+    # Only set for algorithm="auto"
+    selection: Optional[SelectionInfo] = None
+
+
+class ExternalSortRequest(BaseModel):
+    # Algorithm used to sort each in-memory run: "builtin" (list.sort) or an
+    # O(n log n) worst-case sorter (RUN_ALGORITHMS)
+    algorithm: str = "builtin"
+    size: int = Field(ge=2, le=5_000_000)
+    distribution: str
+    file_format: str = "binary"
+    chunk_size: int = Field(default=100_000, ge=16, le=5_000_000)
+    fan_in: int = Field(default=16, ge=2, le=1024)
+    buffer_items: int = Field(default=8192, ge=1, le=1_000_000)
+
+
+class ExternalSortMetrics(Metrics):
+    file_format: str
+    runs: int
+    merge_passes: int
+    bytes_read: int
+    bytes_written: int
+    throughput_mb_s: float
+    items_per_s: float
+
+
+class ExternalSortResponse(BaseModel):
+    run_id: int
+    metrics: ExternalSortMetrics
+
+
+class CompareRequest(BaseModel):
+    # Defaults to every supported algorithm
+    algorithms: Optional[List[str]] = None
+    size: int = Field(ge=2, le=5000)
+    distribution: str
+    # Same bounds as size, which FRAME_BUDGET is sized for
+    array: Optional[List[int]] = Field(default=None, min_length=2, max_length=5000)
+    trials: int = Field(default=3, ge=1, le=20)
+    frames: int = Field(default=100, ge=2, le=300)
+    # 0/1 runs in-process; more spreads the recording runs over a process
+    # pool (timed trials always run one at a time)
+    workers: int = Field(default=0, ge=0, le=8)
+    backend: str = "list"
+    # For the whole comparison (capped by COMPARE_TIME_LIMIT_MS), split
+    # equally between the algorithms
+    time_limit_ms: Optional[float] = Field(default=None, gt=0)
+
+
+class CompareResult(BaseModel):
+    algorithm: str
+    comparisons: int
+    swaps: int
+    runtimes_ms: List[float]
+    median_ms: float
+    mean_ms: float
+    stdev_ms: float
+    min_ms: float
+    frames: List[List[int]]
+    # False if the time limit cut off any of this algorithm's runs
+    completed: bool = True
+
+
+class CompareResponse(BaseModel):
+    n: int
+    distribution: str
+    trials: int
+    frame_count: int
+    completed: bool = True
+    results: List[CompareResult]
 
 
 class RunRecord(BaseModel):
@@ -53,14 +156,17 @@ class RunRecord(BaseModel):
 
 class PredictRequest(BaseModel):
     algorithm: str
-    n: int = Field(ge=2, le=100000)
-    distribution: str
+    # Either n + distribution, or the actual input array to profile
+    n: Optional[int] = Field(default=None, ge=2, le=100000)
+    distribution: Optional[str] = None
+    array: Optional[List[int]] = Field(default=None, min_length=2, max_length=100000)
 
 
 class PredictResponse(BaseModel):
     predicted_class: str
     class_probabilities: Dict[str, float]
     predicted_runtime_ms: float
+    profile: Optional[Dict[str, float]] = None
 
 
 class TrainResponse(BaseModel):
@@ -68,3 +174,31 @@ class TrainResponse(BaseModel):
     trained_on_samples: int
     accuracy: float
     runtime_mae_ms: float
+
+
+class RollupStats(BaseModel):
+    algorithm: str
+    distribution: str
+    # Runs with n_bucket <= n < 2 * n_bucket
+    n_bucket: int
+    count: int
+    mean_n: float
+    mean_ms: float
+    stdev_ms: float
+    min_ms: Optional[float]
+    max_ms: Optional[float]
+    # DDSketch estimates, within 1% of the true quantile
+    p50_ms: Optional[float]
+    p90_ms: Optional[float]
+    p99_ms: Optional[float]
+    mean_comparisons: float
+    mean_swaps: float
+
+
+class SeriesPoint(RollupStats):
+    bucket_start: datetime
+
+
+class CompactResponse(BaseModel):
+    raw_runs_deleted: int
+    hourly_buckets_deleted: int
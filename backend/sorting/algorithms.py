@@ -1,7 +1,8 @@
 # backend/sorting/algorithms.py
 from __future__ import annotations
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Optional
 import random
+import threading
 import time
 import math
 
@@ -58,8 +59,40 @@ SUPPORTED_ALGORITHMS: Dict[str, Dict] = {
     },
 }
 
-DISTRIBUTIONS = ["random", "sorted", "reverse",
-                 "nearly_sorted", "many_duplicates"]
+DISTRIBUTION_LABELS: Dict[str, str] = {
+    "random": "Random",
+    "sorted": "Sorted",
+    "reverse": "Reverse",
+    "nearly_sorted": "Nearly sorted",
+    "many_duplicates": "Many duplicates",
+}
+
+DISTRIBUTIONS = list(DISTRIBUTION_LABELS)
+
+# Canonical encodings shared with the ML model: position in the registry,
+# looked up by API key or by display label
+ALGORITHM_INDEX: Dict[str, int] = {
+    name: i
+    for i, (key, meta) in enumerate(SUPPORTED_ALGORITHMS.items())
+    for name in (key, meta["label"])
+}
+
+DISTRIBUTION_INDEX: Dict[str, int] = {
+    name: i
+    for i, (key, label) in enumerate(DISTRIBUTION_LABELS.items())
+    for name in (key, label)
+}
+
+# "list" runs the pure-Python sorters below, "numpy" the kernels in kernels.py
+SORT_BACKENDS = ["list", "numpy"]
+
+# Values the NumPy paths (kernels, profiler, shared-memory compare) can hold;
+# the list sorters take any int
+INT64_MIN, INT64_MAX = -(1 << 63), (1 << 63) - 1
+
+
+def fits_int64(arr: List[int]) -> bool:
+    return not arr or (INT64_MIN <= min(arr) and max(arr) <= INT64_MAX)
 
 
 def generate_array(n: int, distribution: Distribution) -> List[int]:
@@ -84,6 +117,93 @@ def generate_array(n: int, distribution: Distribution) -> List[int]:
     return base
 
 
+class SortInterrupted(Exception):
+    """
+    Raised when a sort stops before completion (deadline, operation budget or
+    cancellation). The sorter attaches its state at the point it stopped.
+    """
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+        self.array: List[int] = []
+        self.comparisons = 0
+        self.swaps = 0
+        self.steps: List[List[int]] = []
+        self.progress = 0.0
+        self.runtime_ms = 0.0
+
+    def attach(self, arr: List[int], comps: int, swaps: int, steps: List[List[int]], progress: float):
+        self.array = list(arr)
+        self.comparisons = comps
+        self.swaps = swaps
+        self.steps = steps
+        self.progress = max(0.0, min(progress, 1.0))
+
+
+class SortBudget:
+    """
+    Limits for a sort: wall-clock time, a comparison budget and/or a cancel
+    event. Sorters compare their comparison count against the next check point
+    once per outer step (pass, insertion, merge, partition, sift) and only
+    poll the budget every `check_every` comparisons, so a sort may overrun the
+    comparison budget by at most one outer step.
+
+    The deadline is armed by the first sort that uses the budget, so one
+    budget can bound a series of sorts (compare trials, external-sort runs);
+    the comparison budget applies to each sort on its own. `cancel_event` is
+    anything with is_set().
+    """
+
+    def __init__(
+        self,
+        time_limit_ms: Optional[float] = None,
+        max_comparisons: Optional[int] = None,
+        cancel_event: Optional[threading.Event] = None,
+        check_every: int = 1024,
+    ):
+        self.time_limit_ms = time_limit_ms
+        self.max_comparisons = max_comparisons
+        self.cancel_event = cancel_event
+        self.check_every = check_every
+        self.deadline: Optional[float] = None
+
+    def start(self) -> int:
+        """Arm the deadline if not yet armed; returns the comparison count of the first check."""
+        if self.time_limit_ms is not None and self.deadline is None:
+            self.deadline = time.perf_counter() + self.time_limit_ms / 1000.0
+        return self._next(0)
+
+    def _next(self, comps: int) -> int:
+        nxt = comps + self.check_every
+        if self.max_comparisons is not None:
+            nxt = min(nxt, self.max_comparisons)
+        return nxt
+
+    def check(self, comps: int) -> int:
+        """Raise SortInterrupted if a limit is hit, else return the next check point."""
+        if self.max_comparisons is not None and comps >= self.max_comparisons:
+            raise SortInterrupted("operation_budget")
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise SortInterrupted("cancelled")
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            raise SortInterrupted("deadline")
+        return self._next(comps)
+
+
+# Check point that is never reached when a sort runs without a budget
+_NEVER = 1 << 62
+
+
+def _first_check(budget: Optional[SortBudget]) -> int:
+    return budget.start() if budget is not None else _NEVER
+
+
+# Frames a recording run keeps by default; callers needing fewer pass
+# max_states so the history is never recorded in full
+MAX_STATES = 300
+
+
 def maybe_record_step(steps: List[List[int]], arr: List[int], step_interval: int, step_count: int):
     if step_interval <= 0:
         return
@@ -91,106 +211,148 @@ def maybe_record_step(steps: List[List[int]], arr: List[int], step_interval: int
         steps.append(list(arr))
 
 
-def bubble_sort(arr: List[int], record_steps: bool) -> Tuple[List[int], int, int, List[List[int]]]:
+def bubble_sort(
+    arr: List[int],
+    record_steps: bool,
+    budget: Optional[SortBudget] = None,
+    max_states: int = MAX_STATES,
+) -> Tuple[List[int], int, int, List[List[int]]]:
     a = list(arr)
     n = len(a)
     comps = swaps = 0
     steps: List[List[int]] = []
-    max_states = 300
     step_interval = max(1, (n * n) // max_states)
     step_counter = 0
+    next_check = _first_check(budget)
     if record_steps:
         steps.append(list(a))
-    for i in range(n):
-        for j in range(0, n - i - 1):
-            comps += 1
-            if a[j] > a[j + 1]:
-                a[j], a[j + 1] = a[j + 1], a[j]
-                swaps += 1
-            if record_steps:
-                step_counter += 1
-                maybe_record_step(steps, a, step_interval, step_counter)
+    try:
+        for i in range(n):
+            if comps >= next_check:
+                next_check = budget.check(comps)
+            for j in range(0, n - i - 1):
+                comps += 1
+                if a[j] > a[j + 1]:
+                    a[j], a[j + 1] = a[j + 1], a[j]
+                    swaps += 1
+                if record_steps:
+                    step_counter += 1
+                    maybe_record_step(steps, a, step_interval, step_counter)
+    except SortInterrupted as e:
+        # no early exit, so the comparison count is exact progress
+        e.attach(a, comps, swaps, steps, comps / max(1, n * (n - 1) // 2))
+        raise
     if record_steps:
         steps.append(list(a))
     return a, comps, swaps, steps
 
 
-def insertion_sort(arr: List[int], record_steps: bool) -> Tuple[List[int], int, int, List[List[int]]]:
+def insertion_sort(
+    arr: List[int],
+    record_steps: bool,
+    budget: Optional[SortBudget] = None,
+    max_states: int = MAX_STATES,
+) -> Tuple[List[int], int, int, List[List[int]]]:
     a = list(arr)
     comps = swaps = 0
     steps: List[List[int]] = []
-    max_states = 300
     n = len(a)
     step_interval = max(1, (n * n) // max_states)
     step_counter = 0
+    next_check = _first_check(budget)
     if record_steps:
         steps.append(list(a))
-    for i in range(1, n):
-        key = a[i]
-        j = i - 1
-        while j >= 0:
-            comps += 1
-            if a[j] > key:
-                a[j + 1] = a[j]
-                swaps += 1
-                j -= 1
-            else:
-                break
+    try:
+        for i in range(1, n):
+            if comps >= next_check:
+                next_check = budget.check(comps)
+            key = a[i]
+            j = i - 1
+            while j >= 0:
+                comps += 1
+                if a[j] > key:
+                    a[j + 1] = a[j]
+                    swaps += 1
+                    j -= 1
+                else:
+                    break
+                if record_steps:
+                    step_counter += 1
+                    maybe_record_step(steps, a, step_interval, step_counter)
+            a[j + 1] = key
             if record_steps:
                 step_counter += 1
                 maybe_record_step(steps, a, step_interval, step_counter)
-        a[j + 1] = key
-        if record_steps:
-            step_counter += 1
-            maybe_record_step(steps, a, step_interval, step_counter)
+    except SortInterrupted as e:
+        e.attach(a, comps, swaps, steps, (i - 1) / max(1, n - 1))
+        raise
     if record_steps:
         steps.append(list(a))
     return a, comps, swaps, steps
 
 
-def selection_sort(arr: List[int], record_steps: bool) -> Tuple[List[int], int, int, List[List[int]]]:
+def selection_sort(
+    arr: List[int],
+    record_steps: bool,
+    budget: Optional[SortBudget] = None,
+    max_states: int = MAX_STATES,
+) -> Tuple[List[int], int, int, List[List[int]]]:
     a = list(arr)
     n = len(a)
     comps = swaps = 0
     steps: List[List[int]] = []
-    max_states = 300
-    step_interval = max(1, (n * n) // max_states)
+    # one recorded step per pass
+    step_interval = max(1, n // max_states)
     step_counter = 0
+    next_check = _first_check(budget)
     if record_steps:
         steps.append(list(a))
-    for i in range(n):
-        min_idx = i
-        for j in range(i + 1, n):
-            comps += 1
-            if a[j] < a[min_idx]:
-                min_idx = j
-        if min_idx != i:
-            a[i], a[min_idx] = a[min_idx], a[i]
-            swaps += 1
-        if record_steps:
-            step_counter += 1
-            maybe_record_step(steps, a, step_interval, step_counter)
+    try:
+        for i in range(n):
+            if comps >= next_check:
+                next_check = budget.check(comps)
+            min_idx = i
+            for j in range(i + 1, n):
+                comps += 1
+                if a[j] < a[min_idx]:
+                    min_idx = j
+            if min_idx != i:
+                a[i], a[min_idx] = a[min_idx], a[i]
+                swaps += 1
+            if record_steps:
+                step_counter += 1
+                maybe_record_step(steps, a, step_interval, step_counter)
+    except SortInterrupted as e:
+        e.attach(a, comps, swaps, steps, comps / max(1, n * (n - 1) // 2))
+        raise
     if record_steps:
         steps.append(list(a))
     return a, comps, swaps, steps
 
 
-def merge_sort(arr: List[int], record_steps: bool) -> Tuple[List[int], int, int, List[List[int]]]:
+def merge_sort(
+    arr: List[int],
+    record_steps: bool,
+    budget: Optional[SortBudget] = None,
+    max_states: int = MAX_STATES,
+) -> Tuple[List[int], int, int, List[List[int]]]:
     a = list(arr)
     comps = swaps = 0
     steps: List[List[int]] = []
-    max_states = 300
     approx_ops = len(a) * max(1, int(math.log2(len(a) or 1))) * 2
     step_interval = max(1, approx_ops // max_states)
     step_counter = 0
+    next_check = _first_check(budget)
 
     def merge_sort_rec(l: int, r: int):
-        nonlocal comps, swaps, step_counter
+        nonlocal comps, swaps, step_counter, next_check
         if l >= r:
             return
         m = (l + r) // 2
         merge_sort_rec(l, m)
         merge_sort_rec(m + 1, r)
+        if comps >= next_check:
+            next_check = budget.check(comps)
         temp = []
         i, j = l, m + 1
         while i <= m and j <= r:
@@ -220,23 +382,38 @@ def merge_sort(arr: List[int], record_steps: bool) -> Tuple[List[int], int, int,
 
     if record_steps:
         steps.append(list(a))
-    merge_sort_rec(0, len(a) - 1)
+    try:
+        merge_sort_rec(0, len(a) - 1)
+    except SortInterrupted as e:
+        # every merge level moves all n elements once
+        levels = max(1, math.ceil(math.log2(len(a) or 1)))
+        e.attach(a, comps, swaps, steps, swaps / (len(a) * levels))
+        raise
     if record_steps:
         steps.append(list(a))
     return a, comps, swaps, steps
 
 
-def quick_sort(arr: List[int], record_steps: bool) -> Tuple[List[int], int, int, List[List[int]]]:
+def quick_sort(
+    arr: List[int],
+    record_steps: bool,
+    budget: Optional[SortBudget] = None,
+    max_states: int = MAX_STATES,
+) -> Tuple[List[int], int, int, List[List[int]]]:
     a = list(arr)
     comps = swaps = 0
     steps: List[List[int]] = []
     approx_ops = len(a) * max(1, int(math.log2(len(a) or 1))) * 2
-    max_states = 300
     step_interval = max(1, approx_ops // max_states)
     step_counter = 0
+    next_check = _first_check(budget)
+    # elements already in their final position
+    placed = 0
 
     def partition(low: int, high: int) -> int:
-        nonlocal comps, swaps, step_counter
+        nonlocal comps, swaps, step_counter, next_check
+        if comps >= next_check:
+            next_check = budget.check(comps)
         pivot = a[high]
         i = low - 1
         for j in range(low, high):
@@ -256,28 +433,47 @@ def quick_sort(arr: List[int], record_steps: bool) -> Tuple[List[int], int, int,
         return i + 1
 
     def qs(low: int, high: int):
-        if low < high:
+        # Recurse into the smaller side and loop on the larger one, so the
+        # stack stays O(log n) even when presorted input degrades to O(n^2)
+        nonlocal placed
+        while low < high:
             pi = partition(low, high)
-            qs(low, pi - 1)
-            qs(pi + 1, high)
+            placed += 1
+            if pi - low < high - pi:
+                qs(low, pi - 1)
+                low = pi + 1
+            else:
+                qs(pi + 1, high)
+                high = pi - 1
+        if low == high:
+            placed += 1
 
     if record_steps:
         steps.append(list(a))
-    qs(0, len(a) - 1)
+    try:
+        qs(0, len(a) - 1)
+    except SortInterrupted as e:
+        e.attach(a, comps, swaps, steps, placed / max(1, len(a)))
+        raise
     if record_steps:
         steps.append(list(a))
     return a, comps, swaps, steps
 
 
-def heap_sort(arr: List[int], record_steps: bool) -> Tuple[List[int], int, int, List[List[int]]]:
+def heap_sort(
+    arr: List[int],
+    record_steps: bool,
+    budget: Optional[SortBudget] = None,
+    max_states: int = MAX_STATES,
+) -> Tuple[List[int], int, int, List[List[int]]]:
     a = list(arr)
     n = len(a)
     comps = swaps = 0
     steps: List[List[int]] = []
-    max_states = 300
     approx_ops = n * max(1, int(math.log2(n or 1))) * 2
     step_interval = max(1, approx_ops // max_states)
     step_counter = 0
+    next_check = _first_check(budget)
 
     def heapify(nh: int, i: int):
         nonlocal comps, swaps, step_counter
@@ -303,23 +499,63 @@ def heap_sort(arr: List[int], record_steps: bool) -> Tuple[List[int], int, int,
 
     if record_steps:
         steps.append(list(a))
-    # Build max heap
-    for i in range(n // 2 - 1, -1, -1):
-        heapify(n, i)
-    # Extract elements
-    for i in range(n - 1, 0, -1):
-        a[i], a[0] = a[0], a[i]
-        swaps += 1
-        if record_steps:
-            step_counter += 1
-            maybe_record_step(steps, a, step_interval, step_counter)
-        heapify(i, 0)
+    extracted = 0
+    try:
+        # Build max heap
+        for i in range(n // 2 - 1, -1, -1):
+            if comps >= next_check:
+                next_check = budget.check(comps)
+            heapify(n, i)
+        # Extract elements
+        for i in range(n - 1, 0, -1):
+            if comps >= next_check:
+                next_check = budget.check(comps)
+            a[i], a[0] = a[0], a[i]
+            swaps += 1
+            if record_steps:
+                step_counter += 1
+                maybe_record_step(steps, a, step_interval, step_counter)
+            heapify(i, 0)
+            extracted += 1
+    except SortInterrupted as e:
+        # the O(n) heap build counts as no progress
+        e.attach(a, comps, swaps, steps, extracted / max(1, n - 1))
+        raise
     if record_steps:
         steps.append(list(a))
     return a, comps, swaps, steps
 
 
-def run_sort(algorithm: str, arr: List[int], record_steps: bool):
+def run_sort(
+    algorithm: str,
+    arr: List[int],
+    record_steps: bool,
+    backend: str = "list",
+    budget: Optional[SortBudget] = None,
+    max_states: int = MAX_STATES,
+):
+    """
+    Sort `arr` and time it. Returns (sorted, comparisons, swaps, runtime_ms,
+    steps), with about `max_states` recorded steps when record_steps is set.
+    With a `budget` the sort may stop early by raising SortInterrupted
+    carrying the partial state and runtime.
+    """
+    if backend == "numpy":
+        # Imported here so list-only callers never pay for NumPy
+        from .kernels import NUMPY_KERNELS
+        if algorithm not in NUMPY_KERNELS:
+            raise ValueError(f"Unsupported algorithm: {algorithm}")
+        start = time.perf_counter()
+        try:
+            sorted_np, comps, swaps, steps = NUMPY_KERNELS[algorithm](
+                arr, record_steps, max_states=max_states, budget=budget)
+        except SortInterrupted as e:
+            e.runtime_ms = (time.perf_counter() - start) * 1000.0
+            raise
+        end = time.perf_counter()
+        return sorted_np.tolist(), comps, swaps, (end - start) * 1000.0, steps
+    if backend != "list":
+        raise ValueError(f"Unsupported backend: {backend}")
     func_map = {
         "bubble_sort": bubble_sort,
         "insertion_sort": insertion_sort,
@@ -331,7 +567,12 @@ def run_sort(algorithm: str, arr: List[int], record_steps: bool):
     if algorithm not in func_map:
         raise ValueError(f"Unsupported algorithm: {algorithm}")
     start = time.perf_counter()
-    sorted_arr, comps, swaps, steps = func_map[algorithm](arr, record_steps)
+    try:
+        sorted_arr, comps, swaps, steps = func_map[algorithm](
+            arr, record_steps, budget, max_states)
+    except SortInterrupted as e:
+        e.runtime_ms = (time.perf_counter() - start) * 1000.0
+        raise
     end = time.perf_counter()
     runtime_ms = (end - start) * 1000.0
     return sorted_arr, comps, swaps, runtime_ms, steps
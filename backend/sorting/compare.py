@@ -0,0 +1,181 @@
+# backend/sorting/compare.py
+from __future__ import annotations
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+import math
+import statistics
+import time
+
+from .algorithms import SortBudget, SortInterrupted, run_sort
+
+# Upper bound on the values held across all returned traces
+FRAME_BUDGET = 2_000_000
+
+
+def downsample_frames(steps: List[List[int]], frames: int) -> List[List[int]]:
+    """
+    Resample a step history to exactly `frames` frames spread evenly over the
+    run (first and last state included), so traces of different algorithms
+    line up frame for frame.
+    """
+    if not steps or frames <= 0:
+        return []
+    if frames == 1:
+        return [steps[-1]]
+    last = len(steps) - 1
+    return [steps[round(i * last / (frames - 1))] for i in range(frames)]
+
+
+def frames_per_trace(n: int, traces: int, frames: int, budget: int = FRAME_BUDGET) -> int:
+    """Largest frame count <= `frames` keeping all traces within `budget` values."""
+    if n == 0 or traces == 0:
+        return frames
+    return max(2, min(frames, budget // (n * traces)))
+
+
+def _run_on_shared(
+    shm_name: str,
+    n: int,
+    algorithm: str,
+    backend: str,
+    frames: int,
+    deadline: Optional[float] = None,
+    time_limit_ms: Optional[float] = None,
+) -> Tuple[str, float, int, int, List[List[int]], bool]:
+    """
+    One trial on the shared input. The sorters copy their input into a
+    working buffer, so the shared segment is only ever read. With frames > 0
+    the sorter records at the interval for about `frames` steps, so neither
+    the worker nor the result holds more than the frame budget.
+
+    The run stops at `time_limit_ms` (what is left of its algorithm's share)
+    or at `deadline`, a time.time() value shared by all runs of a comparison
+    (and across pool processes), whichever comes first. A run cut off
+    reports its partial counters and frames with completed=False.
+    """
+    budget = None
+    if deadline is not None or time_limit_ms is not None:
+        remaining_ms = min(
+            (deadline - time.time()) * 1000.0 if deadline is not None else math.inf,
+            time_limit_ms if time_limit_ms is not None else math.inf)
+        if remaining_ms <= 0:
+            return algorithm, 0.0, 0, 0, [], False
+        budget = SortBudget(time_limit_ms=remaining_ms)
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        view = shm.buf.cast("q")[:n]
+        try:
+            _, comps, swaps, runtime_ms, steps = run_sort(
+                algorithm, view, frames > 0, backend, budget, max(frames, 1))
+            completed = True
+        except SortInterrupted as e:
+            comps, swaps, runtime_ms, steps = e.comparisons, e.swaps, e.runtime_ms, e.steps
+            completed = False
+        finally:
+            view.release()
+    finally:
+        shm.close()
+    return algorithm, runtime_ms, comps, swaps, downsample_frames(steps, frames), completed
+
+
+def trial_schedule(algorithms: List[str], trials: int) -> List[Tuple[int, str]]:
+    """
+    Interleave trials round-robin, rotating the starting algorithm each round
+    so no algorithm always runs first (cold caches) or last (heated CPU).
+    """
+    k = len(algorithms)
+    schedule: List[Tuple[int, str]] = []
+    for t in range(trials):
+        for i in range(k):
+            schedule.append((t, algorithms[(t + i) % k]))
+    return schedule
+
+
+def compare_algorithms(
+    algorithms: List[str],
+    arr: List[int],
+    trials: int = 3,
+    frames: int = 100,
+    workers: int = 0,
+    backend: str = "list",
+    time_limit_ms: Optional[float] = None,
+) -> Dict[str, Dict]:
+    """
+    Race `algorithms` on one input.
+
+    The input is placed once in shared memory and every run reads it from
+    there. Each algorithm gets one recording run, whose steps are downsampled
+    to a common frame count, followed by `trials` interleaved timed runs
+    without step recording. With workers > 1 the recording runs are spread
+    over a process pool; the timed runs always go one after another, since
+    concurrent runs would compete for CPU and skew each other's timings.
+
+    `time_limit_ms` bounds the whole comparison, and each algorithm gets an
+    equal share of it for its recording run and trials, so a slow algorithm
+    cannot starve the ones after it. Runs cut off are left out of the timing
+    statistics, and algorithms with such a run are reported with
+    completed=False.
+    """
+    deadline = time.time() + time_limit_ms / 1000.0 if time_limit_ms is not None else None
+    # Unspent time of each algorithm's share, None without a limit
+    share_ms: Dict[str, Optional[float]] = {
+        a: time_limit_ms / len(algorithms) if time_limit_ms is not None else None
+        for a in algorithms
+    }
+
+    def spend(outcome: Tuple) -> Tuple:
+        algo, runtime_ms = outcome[0], outcome[1]
+        if share_ms[algo] is not None:
+            share_ms[algo] -= runtime_ms
+        return outcome
+
+    n = len(arr)
+    frame_count = frames_per_trace(n, len(algorithms), frames)
+    data = array("q", arr)
+    shm = shared_memory.SharedMemory(create=True, size=max(1, n) * data.itemsize)
+    try:
+        shm.buf[:n * data.itemsize] = data.tobytes()
+        del data
+
+        jobs: List[Tuple[str, int]] = [(a, frame_count) for a in algorithms]
+        timed: List[Tuple[str, int]] = [(a, 0) for _, a in trial_schedule(algorithms, trials)]
+
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(_run_on_shared, shm.name, n, a, backend, f,
+                                       deadline, share_ms[a])
+                           for a, f in jobs]
+                outcomes = [spend(fut.result()) for fut in futures]
+        else:
+            outcomes = [spend(_run_on_shared(shm.name, n, a, backend, f, deadline, share_ms[a]))
+                        for a, f in jobs]
+        outcomes += [spend(_run_on_shared(shm.name, n, a, backend, f, deadline, share_ms[a]))
+                     for a, f in timed]
+        jobs += timed
+    finally:
+        shm.close()
+        shm.unlink()
+
+    results: Dict[str, Dict] = {
+        a: {"runtimes_ms": [], "comparisons": 0, "swaps": 0, "frames": [], "completed": True}
+        for a in algorithms
+    }
+    for (algo, record), (_, runtime_ms, comps, swaps, trace, completed) in zip(jobs, outcomes):
+        res = results[algo]
+        res["completed"] = res["completed"] and completed
+        if record:
+            res["frames"] = trace
+            res["comparisons"] = comps
+            res["swaps"] = swaps
+        elif completed:
+            res["runtimes_ms"].append(runtime_ms)
+
+    for res in results.values():
+        rts = res["runtimes_ms"]
+        res["median_ms"] = statistics.median(rts) if rts else 0.0
+        res["mean_ms"] = statistics.fmean(rts) if rts else 0.0
+        res["stdev_ms"] = statistics.stdev(rts) if len(rts) > 1 else 0.0
+        res["min_ms"] = min(rts) if rts else 0.0
+    return results
@@ -0,0 +1,264 @@
+# backend/sorting/external.py
+from __future__ import annotations
+from array import array
+from typing import Dict, List, Optional, Iterator, Tuple
+import heapq
+import math
+import mmap
+import os
+import tempfile
+import time
+
+from .algorithms import SUPPORTED_ALGORITHMS, SortBudget, run_sort
+
+# Records are stored as signed 64-bit integers in binary files and spilled runs.
+ITEM_SIZE = array("q").itemsize
+
+FILE_FORMATS = ["binary", "lines"]
+
+# Sorters allowed for run generation: chunks reach millions of values, where
+# an O(n^2) one would take hours per run. Filtered on the worst case, since
+# the generated sorted/reverse inputs are exactly quick sort's worst case
+RUN_ALGORITHMS = [a for a, info in SUPPORTED_ALGORITHMS.items()
+                  if info["worst"] != "O(n^2)"]
+
+
+def _read_chunks(path: str, fmt: str, chunk_size: int) -> Iterator[List[int]]:
+    """
+    Yield the input file as lists of at most `chunk_size` integers.
+    `binary` files hold native int64 values, `lines` files one integer per line.
+    """
+    if fmt == "binary":
+        if os.path.getsize(path) % ITEM_SIZE:
+            raise ValueError(
+                f"Binary input size is not a multiple of {ITEM_SIZE} bytes: {path}")
+        with open(path, "rb") as f:
+            while True:
+                buf = array("q")
+                try:
+                    buf.fromfile(f, chunk_size)
+                except EOFError:
+                    # fromfile keeps whatever it managed to read before EOF
+                    pass
+                if not buf:
+                    return
+                yield buf.tolist()
+    elif fmt == "lines":
+        with open(path, "r") as f:
+            chunk: List[int] = []
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                chunk.append(int(line))
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+            if chunk:
+                yield chunk
+    else:
+        raise ValueError(f"Unsupported file format: {fmt}")
+
+
+def _run_reader(path: str, buffer_items: int) -> Iterator[int]:
+    """Stream a spilled run back in blocks of `buffer_items` values."""
+    with open(path, "rb") as f:
+        while True:
+            buf = array("q")
+            try:
+                buf.fromfile(f, buffer_items)
+            except EOFError:
+                pass
+            if not buf:
+                return
+            yield from buf
+
+
+def _heap_merge(
+    sources: List[Iterator[int]],
+    emit,
+    buffer_items: int,
+    budget: Optional[SortBudget] = None,
+) -> Tuple[int, int]:
+    """
+    k-way merge of sorted iterators through a min-heap.
+    Output is batched into arrays of `buffer_items` values and handed to `emit`,
+    and the budget is polled once per batch.
+    Returns (items merged, estimated comparisons); each heap replacement is
+    counted as ceil(log2 k) comparisons.
+    """
+    heap: List[Tuple[int, int]] = []
+    for idx, src in enumerate(sources):
+        first = next(src, None)
+        if first is not None:
+            heap.append((first, idx))
+    heapq.heapify(heap)
+
+    per_pop = max(1, math.ceil(math.log2(len(heap)))) if len(heap) > 1 else 0
+    out = array("q")
+    merged = 0
+    while heap:
+        value, idx = heap[0]
+        out.append(value)
+        nxt = next(sources[idx], None)
+        if nxt is None:
+            heapq.heappop(heap)
+        else:
+            heapq.heapreplace(heap, (nxt, idx))
+        if len(out) >= buffer_items:
+            emit(out)
+            merged += len(out)
+            out = array("q")
+            if budget is not None:
+                budget.check(merged * per_pop)
+    if out:
+        emit(out)
+        merged += len(out)
+    return merged, merged * per_pop
+
+
+def external_sort(
+    input_path: str,
+    output_path: str,
+    fmt: str = "binary",
+    chunk_size: int = 100_000,
+    fan_in: int = 16,
+    buffer_items: int = 8192,
+    run_algorithm: Optional[str] = None,
+    tmp_dir: Optional[str] = None,
+    budget: Optional[SortBudget] = None,
+) -> Dict[str, float]:
+    """
+    Sort a file that may not fit in memory.
+
+    The input is read `chunk_size` values at a time, each chunk is sorted in
+    memory (with `run_algorithm` from RUN_ALGORITHMS, or the builtin
+    sort when None) and spilled to a temporary run file. Runs are then merged
+    `fan_in` at a time with a buffered heap merge until one pass remains,
+    which writes straight into an mmap'd output file in the input's format.
+
+    A `budget` bounds the whole sort: it is polled per run and per merged
+    batch, and raises SortInterrupted when it runs out.
+    """
+    if fmt not in FILE_FORMATS:
+        raise ValueError(f"Unsupported file format: {fmt}")
+    if chunk_size < 1 or buffer_items < 1:
+        raise ValueError("chunk_size and buffer_items must be positive")
+    if fan_in < 2:
+        raise ValueError("fan_in must be at least 2")
+    if run_algorithm is not None and run_algorithm not in RUN_ALGORITHMS:
+        raise ValueError(f"Unsupported run algorithm: {run_algorithm}")
+
+    start = time.perf_counter()
+    if budget is not None:
+        budget.start()
+    bytes_read = os.path.getsize(input_path)
+    bytes_written = 0
+    comps = swaps = 0
+    n = 0
+    output_bytes = 0
+
+    with tempfile.TemporaryDirectory(prefix="intellisort-", dir=tmp_dir) as tmp:
+        # --- Run generation ---------------------------------------------------
+        runs: List[str] = []
+        for chunk in _read_chunks(input_path, fmt, chunk_size):
+            if budget is not None:
+                budget.check(comps)
+            if run_algorithm is None:
+                chunk.sort()
+            else:
+                chunk, c, s, _, _ = run_sort(run_algorithm, chunk, False, budget=budget)
+                comps += c
+                swaps += s
+            n += len(chunk)
+            if fmt == "lines":
+                output_bytes += sum(len(str(x)) + 1 for x in chunk)
+            run_path = os.path.join(tmp, f"run-0-{len(runs)}.bin")
+            with open(run_path, "wb") as f:
+                array("q", chunk).tofile(f)
+            bytes_written += len(chunk) * ITEM_SIZE
+            runs.append(run_path)
+        num_runs = len(runs)
+        if fmt == "binary":
+            output_bytes = n * ITEM_SIZE
+
+        # --- Intermediate merge passes ----------------------------------------
+        merge_passes = 0
+        while len(runs) > fan_in:
+            merge_passes += 1
+            next_runs: List[str] = []
+            for g in range(0, len(runs), fan_in):
+                group = runs[g:g + fan_in]
+                run_path = os.path.join(
+                    tmp, f"run-{merge_passes}-{len(next_runs)}.bin")
+                with open(run_path, "wb") as f:
+                    merged, c = _heap_merge(
+                        [_run_reader(p, buffer_items) for p in group],
+                        lambda buf: buf.tofile(f),
+                        buffer_items,
+                        budget,
+                    )
+                comps += c
+                bytes_read += merged * ITEM_SIZE
+                bytes_written += merged * ITEM_SIZE
+                for p in group:
+                    os.remove(p)
+                next_runs.append(run_path)
+            runs = next_runs
+
+        # --- Final merge into the mmap'd output -------------------------------
+        with open(output_path, "w+b") as out:
+            out.truncate(output_bytes)
+            if output_bytes > 0:
+                merge_passes += 1
+                with mmap.mmap(out.fileno(), output_bytes) as mm:
+                    offset = 0
+
+                    def emit(buf: array):
+                        nonlocal offset
+                        if fmt == "binary":
+                            data = buf.tobytes()
+                        else:
+                            data = "".join(f"{x}\n" for x in buf).encode()
+                        mm[offset:offset + len(data)] = data
+                        offset += len(data)
+
+                    merged, c = _heap_merge(
+                        [_run_reader(p, buffer_items) for p in runs],
+                        emit,
+                        buffer_items,
+                        budget,
+                    )
+                    mm.flush()
+                comps += c
+                bytes_read += merged * ITEM_SIZE
+        bytes_written += output_bytes
+
+    runtime_ms = (time.perf_counter() - start) * 1000.0
+    seconds = runtime_ms / 1000.0
+    io_mb = (bytes_read + bytes_written) / (1024 * 1024)
+    return {
+        "n": n,
+        "comparisons": comps,
+        "swaps": swaps,
+        "runtime_ms": runtime_ms,
+        "runs": num_runs,
+        "merge_passes": merge_passes,
+        "bytes_read": bytes_read,
+        "bytes_written": bytes_written,
+        "throughput_mb_s": io_mb / seconds if seconds > 0 else 0.0,
+        "items_per_s": n / seconds if seconds > 0 else 0.0,
+    }
+
+
+def write_input_file(path: str, values: List[int], fmt: str = "binary") -> int:
+    """Write `values` to `path` in one of FILE_FORMATS; returns the byte size."""
+    if fmt == "binary":
+        with open(path, "wb") as f:
+            array("q", values).tofile(f)
+    elif fmt == "lines":
+        with open(path, "w") as f:
+            f.writelines(f"{x}\n" for x in values)
+    else:
+        raise ValueError(f"Unsupported file format: {fmt}")
+    return os.path.getsize(path)
@@ -0,0 +1,438 @@
+# backend/sorting/kernels.py
+"""
+NumPy-backed counterparts of the list sorters in algorithms.py.
+
+Each kernel takes any int buffer (list, array.array('q'), ndarray), works on a
+contiguous int64 array and follows the same algorithm as its list version, so
+with `count=True` it reports the same comparison and swap counts. The inner
+loops are replaced with vectorized equivalents; only the parts that are
+inherently sequential stay in Python.
+"""
+from __future__ import annotations
+from typing import List, Optional, Tuple
+import math
+
+import numpy as np
+
+from .algorithms import SortBudget, SortInterrupted
+
+KernelResult = Tuple[np.ndarray, int, int, List[List[int]]]
+
+# Same frame budget as the list sorters
+MAX_STATES = 300
+
+
+def as_int64(arr) -> np.ndarray:
+    """Copy any integer buffer into a fresh contiguous int64 array."""
+    try:
+        return np.array(arr, dtype=np.int64, copy=True)
+    except OverflowError:
+        raise ValueError("Values must fit in a signed 64-bit integer") from None
+
+
+def _step_interval(events: int, max_states: int) -> int:
+    return max(1, math.ceil(events / max_states))
+
+
+def _check(budget: SortBudget, comps: int, a, swaps: int, steps: List[List[int]], progress: float):
+    """Poll the budget between vectorized passes, attaching the state on interruption."""
+    try:
+        budget.check(comps)
+    except SortInterrupted as e:
+        e.attach(a.tolist() if isinstance(a, np.ndarray) else a, comps, swaps, steps, progress)
+        raise
+
+
+def _record(steps: List[List[int]], a: np.ndarray, step_interval: int, step_count: int):
+    if step_count % step_interval == 0:
+        steps.append(a.tolist())
+
+
+def bubble_sort_np(arr, record_steps: bool = False, count: bool = True,
+                   max_states: int = MAX_STATES,
+                   budget: Optional[SortBudget] = None) -> KernelResult:
+    """
+    One bubble pass carries the running maximum to the end, so position j ends
+    up holding min(prefix_max[j], a[j + 1]) and a swap happened wherever
+    prefix_max[j] > a[j + 1]. Each pass is a single vectorized step.
+    """
+    a = as_int64(arr)
+    n = len(a)
+    comps = swaps = 0
+    steps: List[List[int]] = []
+    if budget is not None:
+        budget.start()
+    step_interval = _step_interval(n, max_states)
+    if record_steps:
+        steps.append(a.tolist())
+    for i in range(n):
+        m = n - i
+        if m < 2:
+            break
+        if budget is not None:
+            _check(budget, comps, a, swaps, steps, comps / max(1, n * (n - 1) // 2))
+        seg = a[:m]
+        pmax = np.maximum.accumulate(seg)
+        nxt = seg[1:]
+        if count:
+            comps += m - 1
+            swaps += int(np.count_nonzero(pmax[:-1] > nxt))
+        last = pmax[-1]
+        seg[:-1] = np.minimum(pmax[:-1], nxt)
+        seg[-1] = last
+        if record_steps:
+            _record(steps, a, step_interval, i + 1)
+    if record_steps:
+        steps.append(a.tolist())
+    return a, comps, swaps, steps
+
+
+def insertion_sort_np(arr, record_steps: bool = False, count: bool = True,
+                      max_states: int = MAX_STATES,
+                      budget: Optional[SortBudget] = None) -> KernelResult:
+    """
+    The insertion point is found with a binary search over the sorted prefix
+    and the shift is a single slice move; the comparison count is recovered
+    from the number of shifted elements.
+    """
+    a = as_int64(arr)
+    n = len(a)
+    comps = swaps = 0
+    steps: List[List[int]] = []
+    if budget is not None:
+        budget.start()
+    step_interval = _step_interval(n, max_states)
+    if record_steps:
+        steps.append(a.tolist())
+    for i in range(1, n):
+        if budget is not None:
+            _check(budget, comps, a, swaps, steps, (i - 1) / max(1, n - 1))
+        key = a[i]
+        pos = int(np.searchsorted(a[:i], key, side="right"))
+        shifted = i - pos
+        if shifted:
+            a[pos + 1:i + 1] = a[pos:i].copy()
+            a[pos] = key
+        if count:
+            swaps += shifted
+            comps += shifted + (1 if pos > 0 else 0)
+        if record_steps:
+            _record(steps, a, step_interval, i)
+    if record_steps:
+        steps.append(a.tolist())
+    return a, comps, swaps, steps
+
+
+def selection_sort_np(arr, record_steps: bool = False, count: bool = True,
+                      max_states: int = MAX_STATES,
+                      budget: Optional[SortBudget] = None) -> KernelResult:
+    """Selection sort with the minimum scan done by argmin (first minimum wins)."""
+    a = as_int64(arr)
+    n = len(a)
+    comps = swaps = 0
+    steps: List[List[int]] = []
+    if budget is not None:
+        budget.start()
+    step_interval = _step_interval(n, max_states)
+    if record_steps:
+        steps.append(a.tolist())
+    for i in range(n):
+        if budget is not None:
+            _check(budget, comps, a, swaps, steps, comps / max(1, n * (n - 1) // 2))
+        min_idx = i + int(np.argmin(a[i:]))
+        if count:
+            comps += n - i - 1
+        if min_idx != i:
+            a[i], a[min_idx] = a[min_idx], a[i]
+            swaps += 1
+        if record_steps:
+            _record(steps, a, step_interval, i + 1)
+    if record_steps:
+        steps.append(a.tolist())
+    if not count:
+        swaps = 0
+    return a, comps, swaps, steps
+
+
+def _ranges(starts: np.ndarray, lengths: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Flatten the index ranges [starts[s], starts[s] + lengths[s]) of a batch of
+    segments. Returns (array indices, segment id, offset within segment).
+    """
+    seg = np.repeat(np.arange(len(starts)), lengths)
+    offsets = np.cumsum(lengths) - lengths
+    local = np.arange(int(lengths.sum())) - offsets[seg]
+    return starts[seg] + local, seg, local
+
+
+def _merge_batch(a: np.ndarray, l: np.ndarray, m: np.ndarray, r: np.ndarray,
+                 base: int, span: int) -> Tuple[int, int]:
+    """
+    Merge a[l:m+1] with a[m+1:r+1] for a batch of disjoint segments at once.
+
+    Keys are offset by segment (seg * span + value - base) so the concatenated
+    halves stay globally sorted and one searchsorted ranks every element
+    against its sibling half; span == 0 means a single segment on raw values.
+    Left elements go before equal right ones, as in the list merge. Returns
+    the (comparisons, moves) the element-by-element merge would make: every
+    element is moved, and all but the tail left once one side runs out is
+    compared.
+    """
+    len_l = m - l + 1
+    len_r = r - m
+    idx_l, seg_l, loc_l = _ranges(l, len_l)
+    idx_r, seg_r, loc_r = _ranges(m + 1, len_r)
+    val_l = a[idx_l]
+    val_r = a[idx_r]
+    key_l = seg_l * span + (val_l - base)
+    key_r = seg_r * span + (val_r - base)
+    off_l = np.cumsum(len_l) - len_l
+    off_r = np.cumsum(len_r) - len_r
+    rank_l = np.searchsorted(key_r, key_l, side="left") - off_r[seg_l]
+    rank_r = np.searchsorted(key_l, key_r, side="right") - off_l[seg_r]
+    a[l[seg_l] + loc_l + rank_l] = val_l
+    a[l[seg_r] + loc_r + rank_r] = val_r
+
+    last_l = off_l + len_l - 1
+    last_r = off_r + len_r - 1
+    leftover = np.where(val_l[last_l] <= val_r[last_r],
+                        len_r - rank_l[last_l], len_l - rank_r[last_r])
+    total = int((len_l + len_r).sum())
+    return total - int(leftover.sum()), total
+
+
+def merge_sort_np(arr, record_steps: bool = False, count: bool = True,
+                  max_states: int = MAX_STATES,
+                  budget: Optional[SortBudget] = None) -> KernelResult:
+    """
+    Merge sort with the same split tree as the top-down list version, merged
+    bottom-up one tree level at a time: all merges on a level are disjoint,
+    so each level is a single batched searchsorted merge.
+    """
+    a = as_int64(arr)
+    n = len(a)
+    comps = swaps = 0
+    steps: List[List[int]] = []
+    if budget is not None:
+        budget.start()
+
+    # Split tree of merge_sort_rec, level by level
+    levels = []
+    l = np.array([0], dtype=np.int64)
+    r = np.array([n - 1], dtype=np.int64)
+    while len(l):
+        keep = l < r
+        l, r = l[keep], r[keep]
+        if not len(l):
+            break
+        m = (l + r) // 2
+        levels.append((l, m, r))
+        l, r = np.concatenate([l, m + 1]), np.concatenate([m, r])
+
+    base = int(a.min()) if n else 0
+    span = (int(a.max()) if n else 0) - base + 1
+    if span < 2 ** 62:
+        batch = max(1, 2 ** 62 // span)
+    else:
+        # Offsetting by segment could overflow int64; merge one at a time
+        batch, base, span = 1, 0, 0
+
+    if record_steps:
+        steps.append(a.tolist())
+    for done, (l, m, r) in enumerate(reversed(levels)):
+        if budget is not None:
+            _check(budget, comps, a, swaps, steps, done / len(levels))
+        for s in range(0, len(l), batch):
+            c, w = _merge_batch(a, l[s:s + batch], m[s:s + batch],
+                                r[s:s + batch], base, span)
+            comps += c
+            swaps += w
+        if record_steps:
+            steps.append(a.tolist())
+    if not count:
+        comps = swaps = 0
+    return a, comps, swaps, steps
+
+
+def _lomuto_batch(a: np.ndarray, low: np.ndarray, high: np.ndarray) -> np.ndarray:
+    """
+    Lomuto-partition (last element as pivot) a batch of disjoint segments at
+    once, producing exactly the arrangement the element-by-element loop
+    would. Returns each pivot's offset within its segment.
+
+    Smaller elements keep their relative order. The >= window behaves like a
+    queue that rotates its front to the back whenever a smaller element is
+    met, so the final value at slot p is whatever was appended at time p: the
+    original element if it was large, otherwise a copy of the slot that was
+    the front then (the number of smaller elements seen before p). Those
+    back-references are resolved by pointer jumping.
+    """
+    body_len = high - low
+    idx, seg, loc = _ranges(low, body_len)
+    pivots = a[high]
+    vals = a[idx]
+    small = vals < pivots[seg]
+    k = np.bincount(seg, weights=small, minlength=len(low)).astype(np.int64)
+    before = np.cumsum(small) - small
+    before -= (np.cumsum(k) - k)[seg]
+    body_off = np.cumsum(body_len) - body_len
+    ptr = body_off[seg] + np.where(small, before, loc)
+    while True:
+        nxt = ptr[ptr]
+        if np.array_equal(nxt, ptr):
+            break
+        ptr = nxt
+
+    body = vals[ptr]
+    body[(body_off[seg] + before)[small]] = vals[small]
+    a[idx] = body
+    # final swap of each pivot into place
+    at_k = body[body_off + np.minimum(k, body_len - 1)]
+    a[high] = np.where(k < body_len, at_k, pivots)
+    a[low + k] = pivots
+    return k
+
+
+def quick_sort_np(arr, record_steps: bool = False, count: bool = True,
+                  max_states: int = MAX_STATES,
+                  budget: Optional[SortBudget] = None) -> KernelResult:
+    """
+    Quick sort with the Lomuto scheme of the list version. Partitions on the
+    same recursion frontier touch disjoint segments, so each frontier is
+    partitioned in one batch of boolean-mask operations.
+    """
+    a = as_int64(arr)
+    n = len(a)
+    comps = swaps = 0
+    steps: List[List[int]] = []
+    if budget is not None:
+        budget.start()
+
+    # The number of frontiers is only known at the end (up to n for sorted
+    # input), so thin out the recorded frames as they pile up
+    step_interval = 1
+    step_counter = 0
+    if record_steps:
+        steps.append(a.tolist())
+    low = np.array([0], dtype=np.int64)
+    high = np.array([n - 1], dtype=np.int64)
+    while True:
+        keep = low < high
+        low, high = low[keep], high[keep]
+        if not len(low):
+            break
+        if budget is not None:
+            # elements outside the pending segments are in their final place
+            pending = int((high - low + 1).sum())
+            _check(budget, comps, a, swaps, steps, 1 - pending / n)
+        k = _lomuto_batch(a, low, high)
+        comps += int((high - low).sum())
+        swaps += int(k.sum()) + len(k)
+        pi = low + k
+        low, high = np.concatenate([low, pi + 1]), np.concatenate([pi - 1, high])
+        if record_steps:
+            step_counter += 1
+            _record(steps, a, step_interval, step_counter)
+            if len(steps) > 2 * max_states:
+                steps = steps[::2]
+                step_interval *= 2
+    if record_steps:
+        steps.append(a.tolist())
+    if not count:
+        comps = swaps = 0
+    return a, comps, swaps, steps
+
+
+def heap_sort_np(arr, record_steps: bool = False, count: bool = True,
+                 max_states: int = MAX_STATES,
+                 budget: Optional[SortBudget] = None) -> KernelResult:
+    """
+    Heap sort whose heap build sifts every node of a tree level at once (their
+    subtrees are disjoint, so this matches the one-at-a-time build). The
+    extraction phase is sequential and runs on a plain list.
+    """
+    a = as_int64(arr)
+    n = len(a)
+    comps = swaps = 0
+    steps: List[List[int]] = []
+    if budget is not None:
+        budget.start()
+    step_interval = _step_interval(n, max_states)
+
+    if record_steps:
+        steps.append(a.tolist())
+    last_parent = n // 2 - 1
+    if last_parent >= 0:
+        depth = int(math.log2(last_parent + 1))
+        for d in range(depth, -1, -1):
+            if budget is not None:
+                _check(budget, comps, a, swaps, steps, 0.0)
+            lo = (1 << d) - 1
+            hi = min((1 << (d + 1)) - 2, last_parent)
+            nodes = np.arange(lo, hi + 1)
+            while len(nodes):
+                l = 2 * nodes + 1
+                r = l + 1
+                has_l = l < n
+                has_r = r < n
+                nodes, l, r, has_r = nodes[has_l], l[has_l], r[has_l], has_r[has_l]
+                if not len(nodes):
+                    break
+                if count:
+                    comps += len(nodes) + int(np.count_nonzero(has_r))
+                largest = np.where(a[l] > a[nodes], l, nodes)
+                r_safe = np.where(has_r, r, l)
+                largest = np.where(has_r & (a[r_safe] > a[largest]), r_safe, largest)
+                move = largest != nodes
+                nodes, largest = nodes[move], largest[move]
+                swaps += len(nodes)
+                a[nodes], a[largest] = a[largest], a[nodes]
+                nodes = largest
+        if record_steps:
+            steps.append(a.tolist())
+
+    h = a.tolist()
+    step_counter = 0
+    for end in range(n - 1, 0, -1):
+        if budget is not None:
+            _check(budget, comps, h, swaps, steps, (n - 1 - end) / (n - 1))
+        h[end], h[0] = h[0], h[end]
+        swaps += 1
+        i = 0
+        while True:
+            largest = i
+            l = 2 * i + 1
+            r = l + 1
+            if l < end:
+                comps += 1
+                if h[l] > h[largest]:
+                    largest = l
+            if r < end:
+                comps += 1
+                if h[r] > h[largest]:
+                    largest = r
+            if largest == i:
+                break
+            h[i], h[largest] = h[largest], h[i]
+            swaps += 1
+            i = largest
+        if record_steps:
+            step_counter += 1
+            if step_counter % step_interval == 0:
+                steps.append(list(h))
+    a[:] = h
+    if record_steps:
+        steps.append(a.tolist())
+    if not count:
+        comps = swaps = 0
+    return a, comps, swaps, steps
+
+
+NUMPY_KERNELS = {
+    "bubble_sort": bubble_sort_np,
+    "insertion_sort": insertion_sort_np,
+    "selection_sort": selection_sort_np,
+    "merge_sort": merge_sort_np,
+    "quick_sort": quick_sort_np,
+    "heap_sort": heap_sort_np,
+}
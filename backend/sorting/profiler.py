@@ -0,0 +1,143 @@
+# backend/sorting/profiler.py
+from __future__ import annotations
+from collections import Counter
+from typing import Dict, List
+import math
+
+import numpy as np
+
+# Number of random index pairs used to estimate the inversion ratio
+INVERSION_SAMPLES = 1024
+
+# Value ranges up to this multiple of n are counted with bincount
+BINCOUNT_RANGE_FACTOR = 8
+
+# Scale-free profile fields fed to the runtime model, in column order
+PROFILE_FEATURES: List[str] = [
+    "run_ratio",
+    "inversion_ratio",
+    "sorted_prefix_ratio",
+    "distinct_ratio",
+    "entropy",
+]
+
+
+def _value_counts(a: np.ndarray) -> np.ndarray:
+    """Occurrence count of every distinct value, in linear time."""
+    lo = int(a.min())
+    span = int(a.max()) - lo + 1
+    if span <= BINCOUNT_RANGE_FACTOR * len(a):
+        counts = np.bincount(a - lo)
+        return counts[counts > 0]
+    # Wide value range: hash instead of allocating a huge bincount table
+    return np.fromiter(Counter(a.tolist()).values(), dtype=np.int64)
+
+
+def profile_array(arr, samples: int = INVERSION_SAMPLES, seed: int = 0) -> Dict[str, float]:
+    """
+    Linear-time summary of how presorted an input is.
+
+    runs / run_ratio: maximal non-decreasing runs (1 for sorted input), and
+                      per element
+    inversion_ratio: fraction of sampled pairs i < j with a[i] > a[j]
+                     (~0 sorted, ~0.5 random, ~1 reversed)
+    sorted_prefix / sorted_prefix_ratio: length of the longest non-decreasing
+                                         prefix, absolute and per element
+    distinct_ratio: distinct values per element
+    entropy: Shannon entropy of the value frequencies normalized by log2(n)
+             (1 when all values are distinct)
+    """
+    try:
+        a = np.asarray(arr, dtype=np.int64)
+    except OverflowError:
+        raise ValueError("Values must fit in a signed 64-bit integer") from None
+    n = len(a)
+    if n < 2:
+        return {
+            "n": n,
+            "runs": n,
+            "run_ratio": 1.0,
+            "inversion_ratio": 0.0,
+            "sorted_prefix": n,
+            "sorted_prefix_ratio": 1.0,
+            "distinct_ratio": 1.0,
+            "entropy": 1.0,
+        }
+
+    descents = np.flatnonzero(a[1:] < a[:-1])
+    runs = len(descents) + 1
+    sorted_prefix = int(descents[0]) + 1 if len(descents) else n
+
+    # Uniform over pairs i < j: draw both ends independently, drop i == j
+    # and order the rest
+    rng = np.random.default_rng(seed)
+    i, j = rng.integers(0, n, size=(2, samples))
+    distinct = i != j
+    lo = np.minimum(i, j)[distinct]
+    hi = np.maximum(i, j)[distinct]
+    inversion_ratio = float(np.count_nonzero(a[lo] > a[hi])) / max(len(lo), 1)
+
+    counts = _value_counts(a)
+    p = counts / n
+    entropy = float(-(p * np.log2(p)).sum()) / math.log2(n)
+
+    return {
+        "n": n,
+        "runs": runs,
+        "run_ratio": runs / n,
+        "inversion_ratio": inversion_ratio,
+        "sorted_prefix": sorted_prefix,
+        "sorted_prefix_ratio": sorted_prefix / n,
+        "distinct_ratio": len(counts) / n,
+        "entropy": entropy,
+    }
+
+
+def typical_profile(distribution: str, n: int) -> Dict[str, float]:
+    """
+    Expected profile of generate_array(n, distribution), for predictions
+    where only the distribution name is known.
+    """
+    n = max(n, 2)
+    logn = math.log2(n)
+    profile = {
+        "n": n,
+        "run_ratio": 0.5,
+        "inversion_ratio": 0.5,
+        "sorted_prefix_ratio": 2.0 / n,
+        "distinct_ratio": 1.0,
+        "entropy": 1.0,
+    }
+    if distribution == "sorted":
+        profile.update(run_ratio=1.0 / n, inversion_ratio=0.0,
+                       sorted_prefix_ratio=1.0)
+    elif distribution == "reverse":
+        profile.update(run_ratio=1.0, inversion_ratio=1.0,
+                       sorted_prefix_ratio=1.0 / n)
+    elif distribution == "nearly_sorted":
+        # n // 10 random transpositions of sorted input
+        profile.update(run_ratio=0.17, inversion_ratio=0.12,
+                       sorted_prefix_ratio=min(1.0, 5.0 / n))
+    elif distribution == "many_duplicates":
+        # values drawn from 1..n // 5
+        profile.update(distinct_ratio=0.2,
+                       entropy=max(0.0, (logn - math.log2(5)) / logn))
+    return profile
+
+
+def profile_features(profile: Dict[str, float]) -> List[float]:
+    return [float(profile[k]) for k in PROFILE_FEATURES]
+
+
+def infer_distribution(profile: Dict[str, float]) -> str:
+    """Map a profile onto the closest of the generator's DISTRIBUTIONS."""
+    n = profile["n"]
+    if profile["distinct_ratio"] <= 0.5:
+        return "many_duplicates"
+    if profile["runs"] <= 1:
+        return "sorted"
+    if profile["runs"] >= n - 1 and profile["inversion_ratio"] >= 0.95:
+        return "reverse"
+    if profile["inversion_ratio"] <= 0.25:
+        return "nearly_sorted"
+    return "random"
@@ -0,0 +1 @@
+# backend/stats/__init__.py
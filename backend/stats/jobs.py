@@ -0,0 +1,62 @@
+# backend/stats/jobs.py
+"""
+Scheduled retention (compact) for the run tables.
+
+With REDIS_URL set, the API schedules compact_job on an rq queue at startup,
+and every run schedules the next one. Run a worker with the scheduler on:
+
+    rq worker intellisort --with-scheduler --url $REDIS_URL
+
+Without Redis, run `python -m backend.stats.jobs` from cron instead.
+"""
+from __future__ import annotations
+from datetime import datetime, timezone
+from typing import Dict
+import os
+import time
+
+from ..database import Base, SessionLocal, engine
+from .rollup import compact
+
+REDIS_URL = os.getenv("REDIS_URL")
+QUEUE_NAME = "intellisort"
+COMPACT_INTERVAL_S = float(os.getenv("COMPACT_INTERVAL_S", "3600"))
+
+
+def _queue():
+    from redis import Redis
+    from rq import Queue
+
+    return Queue(QUEUE_NAME, connection=Redis.from_url(REDIS_URL))
+
+
+def schedule_compaction() -> bool:
+    """
+    Schedule compact_job at the next multiple of COMPACT_INTERVAL_S; returns
+    False when REDIS_URL is not set. The job id is derived from that time, so
+    every API worker starting in the same interval schedules the same job.
+    """
+    if not REDIS_URL:
+        return False
+    slot = int(time.time() // COMPACT_INTERVAL_S) + 1
+    _queue().enqueue_at(
+        datetime.fromtimestamp(slot * COMPACT_INTERVAL_S, timezone.utc),
+        compact_job,
+        job_id=f"compact-{slot}",
+    )
+    return True
+
+
+def compact_job() -> Dict[str, int]:
+    """Apply the retention policy, then schedule the next run."""
+    try:
+        with SessionLocal() as db:
+            return compact(db)
+    finally:
+        schedule_compaction()
+
+
+if __name__ == "__main__":
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        print(compact(db))
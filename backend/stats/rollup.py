@@ -0,0 +1,217 @@
+# backend/stats/rollup.py
+from __future__ import annotations
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple, Type, Union
+import os
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..models import AlgorithmRun, ExternalSortStats, RollupState, RunRollup, RunSeries
+from .sketch import DDSketch, Welford
+
+# Time-series resolutions and their bucket widths
+RESOLUTIONS: Dict[str, timedelta] = {
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+}
+
+# Raw algorithm_runs rows older than this are deleted by compact(); their
+# measurements live on in the rollups and the daily series
+RAW_RETENTION_DAYS = float(os.getenv("RAW_RETENTION_DAYS", "30"))
+# Hourly series buckets older than this are deleted; daily ones are kept
+HOURLY_RETENTION_DAYS = float(os.getenv("HOURLY_RETENTION_DAYS", "14"))
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+_STATE_ID = 1
+
+RollupRow = Union[RunRollup, RunSeries]
+
+
+def n_bucket(n: int) -> int:
+    """Largest power of two <= n (1 for n < 2)."""
+    return 1 << (max(n, 1).bit_length() - 1)
+
+
+def bucket_start(ts: datetime, resolution: str) -> datetime:
+    """Start of the `resolution` bucket containing ts, as naive UTC."""
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    if resolution == "hour":
+        return ts.replace(minute=0, second=0, microsecond=0)
+    if resolution == "day":
+        return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"Unknown resolution: {resolution}")
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class _Accumulator:
+    """A rollup row with its sketch deserialized once, for repeated folding."""
+
+    def __init__(self, row: RollupRow):
+        self.row = row
+        self.runtime = Welford(row.count or 0, row.mean_ms or 0.0, row.m2_ms or 0.0)
+        self.sketch = DDSketch.from_dict(row.sketch)
+
+    def add(self, n: int, runtime_ms: float, comparisons: int, swaps: int) -> None:
+        row = self.row
+        self.runtime.add(runtime_ms)
+        self.sketch.add(runtime_ms)
+        count = self.runtime.count
+        row.mean_n = (row.mean_n or 0.0) + (n - (row.mean_n or 0.0)) / count
+        row.mean_comparisons = (row.mean_comparisons or 0.0) \
+            + (comparisons - (row.mean_comparisons or 0.0)) / count
+        row.mean_swaps = (row.mean_swaps or 0.0) + (swaps - (row.mean_swaps or 0.0)) / count
+        row.min_ms = runtime_ms if row.min_ms is None else min(row.min_ms, runtime_ms)
+        row.max_ms = runtime_ms if row.max_ms is None else max(row.max_ms, runtime_ms)
+
+    def store(self) -> None:
+        self.row.count = self.runtime.count
+        self.row.mean_ms = self.runtime.mean
+        self.row.m2_ms = self.runtime.m2
+        # Assign a new dict so the JSON column is marked dirty
+        self.row.sketch = self.sketch.to_dict()
+
+
+def _get_or_create(db: Session, model: Type[RollupRow], **key) -> RollupRow:
+    """
+    Fetch the row for `key` locked for update, creating it if missing. A
+    concurrent creator of the same key loses on the unique constraint inside
+    a savepoint and re-reads the winner's row.
+    """
+    q = db.query(model).filter_by(**key).with_for_update()
+    row = q.one_or_none()
+    if row is not None:
+        return row
+    try:
+        with db.begin_nested():
+            row = model(count=0, mean_n=0.0, mean_ms=0.0, m2_ms=0.0,
+                        mean_comparisons=0.0, mean_swaps=0.0, **key)
+            db.add(row)
+    except IntegrityError:
+        row = q.one()
+    return row
+
+
+def _targets(run: AlgorithmRun, ts: datetime) -> List[Tuple[Type[RollupRow], Dict]]:
+    key = {
+        "algorithm_name": run.algorithm_name,
+        "distribution": run.distribution,
+        "n_bucket": n_bucket(run.n),
+    }
+    targets: List[Tuple[Type[RollupRow], Dict]] = [(RunRollup, key)]
+    for resolution in RESOLUTIONS:
+        targets.append((RunSeries, {**key, "resolution": resolution,
+                                    "bucket_start": bucket_start(ts, resolution)}))
+    return targets
+
+
+def record_run(db: Session, run: AlgorithmRun) -> None:
+    """
+    Fold a new run into its rollup and series buckets, in the caller's
+    transaction (the caller commits).
+
+    The raw row is flushed first: its INSERT takes the database write lock
+    (SQLite) before the buckets are read, and the buckets are read FOR UPDATE
+    (Postgres), so concurrent requests never lose each other's updates.
+    """
+    db.add(run)
+    db.flush()
+    for model, key in _targets(run, _utcnow()):
+        acc = _Accumulator(_get_or_create(db, model, **key))
+        acc.add(run.n, run.runtime_ms, run.comparisons, run.swaps)
+        acc.store()
+
+
+def backfill(db: Session, batch_size: int = 10_000) -> int:
+    """
+    Fold runs stored before the rollups existed, once per database. Returns
+    the number of runs folded (0 if the backfill already happened).
+    """
+    if db.get(RollupState, _STATE_ID) is not None:
+        return 0
+    last_id = db.query(AlgorithmRun.id).order_by(AlgorithmRun.id.desc()).limit(1).scalar() or 0
+    try:
+        # The state row doubles as a lock: a second worker starting at the
+        # same time fails on its primary key and skips the backfill
+        with db.begin_nested():
+            db.add(RollupState(id=_STATE_ID, backfilled_through=last_id))
+    except IntegrityError:
+        db.rollback()
+        return 0
+
+    accs: Dict[Tuple, _Accumulator] = {}
+    folded = 0
+    runs = (
+        db.query(AlgorithmRun)
+        .filter(AlgorithmRun.id <= last_id)
+        .order_by(AlgorithmRun.id)
+        .yield_per(batch_size)
+    )
+    for run in runs:
+        for model, key in _targets(run, run.created_at or _utcnow()):
+            k = (model.__tablename__,) + tuple(sorted(key.items()))
+            acc = accs.get(k)
+            if acc is None:
+                acc = accs[k] = _Accumulator(_get_or_create(db, model, **key))
+            acc.add(run.n, run.runtime_ms, run.comparisons, run.swaps)
+        folded += 1
+    for acc in accs.values():
+        acc.store()
+    db.commit()
+    return folded
+
+
+def compact(
+    db: Session,
+    raw_retention_days: float = RAW_RETENTION_DAYS,
+    hourly_retention_days: float = HOURLY_RETENTION_DAYS,
+    now: Optional[datetime] = None,
+) -> Dict[str, int]:
+    """
+    Apply the retention policy: delete raw runs and hourly series buckets
+    past their retention. Runs referenced by external_sort_stats are kept,
+    since their disk-side details are not rolled up.
+    """
+    backfill(db)
+    now = now or _utcnow()
+    referenced = db.query(ExternalSortStats.run_id)
+    raw_deleted = (
+        db.query(AlgorithmRun)
+        .filter(AlgorithmRun.created_at < now - timedelta(days=raw_retention_days))
+        .filter(AlgorithmRun.id.not_in(referenced))
+        .delete(synchronize_session=False)
+    )
+    hourly_deleted = (
+        db.query(RunSeries)
+        .filter(RunSeries.resolution == "hour")
+        .filter(RunSeries.bucket_start < now - timedelta(days=hourly_retention_days))
+        .delete(synchronize_session=False)
+    )
+    db.commit()
+    return {"raw_runs_deleted": raw_deleted, "hourly_buckets_deleted": hourly_deleted}
+
+
+def summarize(row: RollupRow) -> Dict:
+    """Public statistics of a rollup or series row."""
+    runtime = Welford(row.count, row.mean_ms, row.m2_ms)
+    summary = {
+        "algorithm": row.algorithm_name,
+        "distribution": row.distribution,
+        "n_bucket": row.n_bucket,
+        "count": row.count,
+        "mean_n": row.mean_n,
+        "mean_ms": row.mean_ms,
+        "stdev_ms": runtime.stdev,
+        "min_ms": row.min_ms,
+        "max_ms": row.max_ms,
+        "mean_comparisons": row.mean_comparisons,
+        "mean_swaps": row.mean_swaps,
+    }
+    for name, value in DDSketch.from_dict(row.sketch).quantiles(QUANTILES).items():
+        summary[f"{name}_ms"] = value
+    return summary
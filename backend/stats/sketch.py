@@ -0,0 +1,137 @@
+# backend/stats/sketch.py
+from __future__ import annotations
+from typing import Dict, Iterable, Optional
+import math
+
+# Quantiles are returned within this relative error of the true value
+RELATIVE_ACCURACY = 0.01
+
+# Bins kept per sketch; beyond this the lowest bins are collapsed together,
+# so only the low quantiles lose accuracy
+MAX_BINS = 2048
+
+# Values at or below this are counted in the zero bin
+MIN_VALUE = 1e-9
+
+
+class Welford:
+    """Running count, mean and variance, mergeable across partitions."""
+
+    __slots__ = ("count", "mean", "m2")
+
+    def __init__(self, count: int = 0, mean: float = 0.0, m2: float = 0.0):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+
+    def add(self, x: float) -> None:
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+
+    def merge(self, other: "Welford") -> None:
+        """Chan et al. pairwise update."""
+        if other.count == 0:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.count = total
+
+    @property
+    def variance(self) -> float:
+        """Sample variance (0 below two observations)."""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stdev(self) -> float:
+        return math.sqrt(self.variance)
+
+
+class DDSketch:
+    """
+    Quantile sketch with relative-error guarantees (Masson et al., 2019).
+
+    Positive values are counted in logarithmic bins of ratio gamma, so every
+    quantile is answered within RELATIVE_ACCURACY of the true value using
+    O(log(max/min)) bins. Sketches with the same accuracy merge exactly by
+    adding bin counts, which is what makes per-bucket rollups combinable.
+    """
+
+    def __init__(self, relative_accuracy: float = RELATIVE_ACCURACY, max_bins: int = MAX_BINS):
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def _key(self, x: float) -> int:
+        return math.ceil(math.log(x) / self._log_gamma)
+
+    def _value(self, key: int) -> float:
+        # Midpoint (in relative terms) of bin (gamma^(k-1), gamma^k]
+        return 2 * self.gamma ** key / (1 + self.gamma)
+
+    def add(self, x: float, weight: int = 1) -> None:
+        self.count += weight
+        if x <= MIN_VALUE:
+            self.zero_count += weight
+            return
+        k = self._key(x)
+        self.bins[k] = self.bins.get(k, 0) + weight
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+
+    def _collapse(self) -> None:
+        keys = sorted(self.bins)
+        excess = len(keys) - self.max_bins
+        target = keys[excess]
+        self.bins[target] += sum(self.bins.pop(k) for k in keys[:excess])
+
+    def merge(self, other: "DDSketch") -> None:
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different accuracy")
+        self.count += other.count
+        self.zero_count += other.zero_count
+        for k, c in other.bins.items():
+            self.bins[k] = self.bins.get(k, 0) + c
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+
+    def quantile(self, q: float) -> Optional[float]:
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for k in sorted(self.bins):
+            seen += self.bins[k]
+            if rank < seen:
+                return self._value(k)
+        return self._value(max(self.bins))
+
+    def quantiles(self, qs: Iterable[float]) -> Dict[str, Optional[float]]:
+        return {f"p{round(q * 100):d}": self.quantile(q) for q in qs}
+
+    def to_dict(self) -> Dict:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "zero_count": self.zero_count,
+            # JSON object keys must be strings
+            "bins": {str(k): c for k, c in self.bins.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict]) -> "DDSketch":
+        if not data:
+            return cls()
+        sketch = cls(relative_accuracy=data["relative_accuracy"])
+        sketch.zero_count = data["zero_count"]
+        sketch.bins = {int(k): c for k, c in data["bins"].items()}
+        sketch.count = sketch.zero_count + sum(sketch.bins.values())
+        return sketch
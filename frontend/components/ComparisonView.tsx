@@ -3,7 +3,7 @@
 
 import { useEffect, useState } from "react";
 import { AlgorithmOption } from "./AlgorithmControls";
-import { runAlgorithm, RunResult } from "../lib/api";
+import { compareAlgorithms, CompareAlgorithmResult } from "../lib/api";
 import SortVisualizer from "./SortVisualizer";
 
 type Props = {
@@ -13,42 +13,41 @@ type Props = {
 };
 
 const defaultAlgoNames = ["bubble_sort", "merge_sort", "quick_sort"];
+const FRAME_INTERVAL_MS = 60;
 
 export default function ComparisonView({ algorithms, distribution, arraySize }: Props) {
     const [selected, setSelected] = useState<string[]>(defaultAlgoNames);
-    const [results, setResults] = useState<Record<string, RunResult | null>>({});
-    const [sharedArray, setSharedArray] = useState<number[] | null>(null);
+    const [results, setResults] = useState<Record<string, CompareAlgorithmResult | null>>({});
+    const [frameCount, setFrameCount] = useState(0);
+    const [frame, setFrame] = useState(0);
 
     useEffect(() => {
         // reset when size/distribution change
         setResults({});
-        setSharedArray(null);
+        setFrameCount(0);
+        setFrame(0);
     }, [arraySize, distribution]);
 
+    useEffect(() => {
+        // traces are frame-aligned, so one index plays them all in lockstep
+        if (frame >= frameCount - 1) return;
+        const timer = setTimeout(() => setFrame(f => f + 1), FRAME_INTERVAL_MS);
+        return () => clearTimeout(timer);
+    }, [frame, frameCount]);
+
     const runComparison = async () => {
         try {
-            // first run with one algorithm to get shared input
-            const base = await runAlgorithm({
-                algorithm: selected[0],
+            // one request: every algorithm runs on the same input
+            const res = await compareAlgorithms({
+                algorithms: selected,
                 size: arraySize,
-                distribution,
-                record_steps: false
+                distribution
             });
-            const original = base.sorted.slice().sort((a, b) => a - b); // we don't know original; for demo we just reuse
-            // In a real version we'd add support for returning initial array from backend.
-
-            const newResults: Record<string, RunResult> = {};
-            for (const name of selected) {
-                const res = await runAlgorithm({
-                    algorithm: name,
-                    size: arraySize,
-                    distribution,
-                    record_steps: false
-                });
-                newResults[name] = res;
-            }
-            setSharedArray(original);
+            const newResults: Record<string, CompareAlgorithmResult> = {};
+            for (const r of res.results) newResults[r.algorithm] = r;
             setResults(newResults);
+            setFrameCount(res.frame_count);
+            setFrame(0);
         } catch (err) {
             console.error(err);
         }
@@ -61,8 +60,8 @@ export default function ComparisonView({ algorithms, distribution, arraySize }:
         winnerByTime = activeResults.reduce((best, [name, res]) => {
             if (!res) return best;
             if (!best) return name;
-            const bestMs = results[best]?.metrics.runtime_ms ?? Infinity;
-            if (res.metrics.runtime_ms < bestMs) return name;
+            const bestMs = results[best]?.median_ms ?? Infinity;
+            if (res.median_ms < bestMs) return name;
             return best;
         }, "" as string);
     }
@@ -79,8 +78,8 @@ export default function ComparisonView({ algorithms, distribution, arraySize }:
                 </button>
             </div>
             <p className="text-xs text-slate-400">
-                All algorithms are run on the same configuration (n = {arraySize}, distribution = {distribution}). The
-                “winner” is the one with the lowest runtime for this specific experiment.
+                All algorithms are run on the same input (n = {arraySize}, distribution = {distribution}) over
+                interleaved trials. The “winner” is the one with the lowest median runtime for this experiment.
             </p>
 
             <div className="grid md:grid-cols-3 gap-4">
@@ -103,19 +102,19 @@ export default function ComparisonView({ algorithms, distribution, arraySize }:
                                 )}
                             </div>
                             <div className="h-24 mb-2">
-                                <SortVisualizer array={res ? res.sorted : sharedArray || []} />
+                                <SortVisualizer array={res ? res.frames[Math.min(frame, res.frames.length - 1)] ?? [] : []} />
                             </div>
                             {res ? (
                                 <ul className="space-y-0.5">
                                     <li>
                                         <span className="text-slate-400">Runtime:</span>{" "}
-                                        {res.metrics.runtime_ms.toFixed(3)} ms
+                                        {res.median_ms.toFixed(3)} ± {res.stdev_ms.toFixed(3)} ms
                                     </li>
                                     <li>
-                                        <span className="text-slate-400">Comparisons:</span> {res.metrics.comparisons}
+                                        <span className="text-slate-400">Comparisons:</span> {res.comparisons}
                                     </li>
                                     <li>
-                                        <span className="text-slate-400">Swaps:</span> {res.metrics.swaps}
+                                        <span className="text-slate-400">Swaps:</span> {res.swaps}
                                     </li>
                                 </ul>
                             ) : (
@@ -24,6 +24,9 @@ export type RunResult = {
     sorted: number[];
     metrics: RunMetrics;
     steps: number[][];
+    completed: boolean;
+    progress: number;
+    stop_reason: string | null;
 };
 
 export type RunRecord = {
@@ -37,12 +40,55 @@ export type RunRecord = {
     created_at: string;
 };
 
+export type RollupStats = {
+    algorithm: string;
+    distribution: string;
+    n_bucket: number;
+    count: number;
+    mean_n: number;
+    mean_ms: number;
+    stdev_ms: number;
+    min_ms: number | null;
+    max_ms: number | null;
+    p50_ms: number | null;
+    p90_ms: number | null;
+    p99_ms: number | null;
+    mean_comparisons: number;
+    mean_swaps: number;
+};
+
+export type SeriesPoint = RollupStats & {
+    bucket_start: string;
+};
+
 export type PredictResult = {
     predicted_class: string;
     class_probabilities: Record<string, number>;
     predicted_runtime_ms: number;
 };
 
+export type CompareAlgorithmResult = {
+    algorithm: string;
+    comparisons: number;
+    swaps: number;
+    runtimes_ms: number[];
+    median_ms: number;
+    mean_ms: number;
+    stdev_ms: number;
+    min_ms: number;
+    frames: number[][];
+    completed: boolean;
+};
+
+export type CompareResult = {
+    n: number;
+    distribution: string;
+    trials: number;
+    frame_count: number;
+    completed: boolean;
+    results: CompareAlgorithmResult[];
+};
+
 const API_URL = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000";
 
 export async function getAlgorithms(): Promise<AlgorithmInfo[]> {
@@ -56,6 +102,9 @@ export async function runAlgorithm(req: {
     size: number;
     distribution: string;
     record_steps: boolean;
+    time_limit_ms?: number;
+    max_comparisons?: number;
+    cancel_token?: string;
 }): Promise<RunResult> {
     const res = await fetch(`${API_URL}/api/run`, {
         method: "POST",
@@ -66,6 +115,13 @@ export async function runAlgorithm(req: {
     return res.json();
 }
 
+export async function cancelRun(cancelToken: string): Promise<void> {
+    const res = await fetch(`${API_URL}/api/run/${encodeURIComponent(cancelToken)}/cancel`, {
+        method: "POST"
+    });
+    if (!res.ok) throw new Error("Failed to cancel run");
+}
+
 export async function getRuns(algorithm?: string): Promise<RunRecord[]> {
     const url = new URL(`${API_URL}/api/runs`);
     if (algorithm) url.searchParams.set("algorithm", algorithm);
@@ -74,6 +130,30 @@ export async function getRuns(algorithm?: string): Promise<RunRecord[]> {
     return res.json();
 }
 
+export async function getStats(algorithm?: string, distribution?: string): Promise<RollupStats[]> {
+    const url = new URL(`${API_URL}/api/stats`);
+    if (algorithm) url.searchParams.set("algorithm", algorithm);
+    if (distribution) url.searchParams.set("distribution", distribution);
+    const res = await fetch(url.toString());
+    if (!res.ok) throw new Error("Failed to fetch stats");
+    return res.json();
+}
+
+export async function getStatsSeries(params: {
+    resolution?: "hour" | "day";
+    algorithm?: string;
+    distribution?: string;
+    n_bucket?: number;
+}): Promise<SeriesPoint[]> {
+    const url = new URL(`${API_URL}/api/stats/series`);
+    for (const [key, value] of Object.entries(params)) {
+        if (value !== undefined) url.searchParams.set(key, String(value));
+    }
+    const res = await fetch(url.toString());
+    if (!res.ok) throw new Error("Failed to fetch stats series");
+    return res.json();
+}
+
 export async function predictRuntime(req: {
     algorithm: string;
     n: number;
@@ -87,3 +167,20 @@ export async function predictRuntime(req: {
     if (!res.ok) throw new Error("Failed to predict runtime");
     return res.json();
 }
+
+export async function compareAlgorithms(req: {
+    algorithms: string[];
+    size: number;
+    distribution: string;
+    trials?: number;
+    frames?: number;
+    time_limit_ms?: number;
+}): Promise<CompareResult> {
+    const res = await fetch(`${API_URL}/api/compare`, {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify(req)
+    });
+    if (!res.ok) throw new Error("Failed to compare algorithms");
+    return res.json();
+}